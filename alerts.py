@@ -0,0 +1,119 @@
+import json
+import os
+from collections import deque
+from functools import lru_cache
+
+from extract import _loose
+
+
+# Keyword subscriptions, one list of keywords per Slack channel:
+#   {"#water": ["water rights", "irrigation"], "#tribal": ["tribal", "indian affairs"]}
+SUBSCRIPTIONS_CONFIG = os.getenv("SUBSCRIPTIONS_CONFIG", "subscriptions.json")
+
+
+# Compare case-, whitespace- and punctuation-insensitively, like extract.Hearing
+# fingerprints ("Water-Rights" == "water  rights")
+def normalize(text):
+    return _loose(text)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over every subscribed keyword: one pass over a
+    hearing's text finds all keywords in it, however many are subscribed.
+    Matches must start and end on word boundaries, so "tribal" does not match
+    "tribalism".
+    """
+    __slots__ = ("goto", "fail", "out", "keywords", "channels")
+
+    def __init__(self, subscriptions):
+        self.goto     = [{}]   # state -> {char: state}
+        self.fail     = [0]
+        self.out      = [()]   # state -> keyword indexes ending here
+        self.keywords = []     # index -> normalized keyword
+        self.channels = []     # index -> channels subscribed to it
+
+        index = {}
+        for channel, keywords in subscriptions.items():
+            for keyword in keywords:
+                keyword = normalize(keyword)
+                if not keyword:
+                    continue
+                if keyword not in index:
+                    index[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    self.channels.append([])
+                    self._add(keyword, index[keyword])
+                if channel not in self.channels[index[keyword]]:
+                    self.channels[index[keyword]].append(channel)
+        self._link()
+
+    def _add(self, keyword, i):
+        state = 0
+        for ch in keyword:
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.out[state] += (i,)
+
+    # Breadth-first failure links; each state also inherits its fallback's outputs
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    # Indexes of the keywords found in text
+    def find(self, text):
+        text = normalize(text)
+        goto, fail, out, keywords = self.goto, self.fail, self.out, self.keywords
+        found, state = set(), 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for i in out[state]:
+                start = end - len(keywords[i]) + 1
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                   (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    found.add(i)
+        return found
+
+    # {channel: [matched keywords]} for a hearing
+    def route(self, *texts):
+        routes = {}
+        for i in sorted(self.find(" | ".join(t for t in texts if t))):
+            for channel in self.channels[i]:
+                routes.setdefault(channel, []).append(self.keywords[i])
+        return routes
+
+
+# Build the matcher from SUBSCRIPTIONS_CONFIG; no file means no subscriptions
+def load_matcher(path=SUBSCRIPTIONS_CONFIG):
+    subscriptions = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            subscriptions = json.load(f)
+        print(f"Loaded {sum(len(k) for k in subscriptions.values())} keyword subscriptions from {path}")
+    return KeywordMatcher(subscriptions)
+
+@lru_cache(maxsize=1)
+def get_matcher():
+    return load_matcher()
+
+def route(title, committee):
+    return get_matcher().route(title, committee)
+
+# Whether any channel subscribed to keywords; without subscriptions, listed events
+# naming an excluded committee can be skipped before their detail request
+def has_subscriptions():
+    return bool(get_matcher().keywords)
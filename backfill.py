@@ -1,109 +1,150 @@
 from fetch import fetch_event_detail
-from extract import get_URL, get_date, parse_date, get_status
-import sqlite3 
-from post import post_slack
+from extract import normalize, content_hash
+import os
+from datetime import datetime, date, timedelta, timezone
+from db import get_conn, archive_payloads, log_changes
+import metrics
 
 
-def backfill_missing_urls():
-    conn = sqlite3.connect("hearings.db")
-    c    = conn.cursor()
-    c.execute("""
-        SELECT id, API_call
-        FROM hearings
-        WHERE (url IS NULL OR url = '')
-          AND date(date) >= date('now')
-    """)
-    rows = c.fetchall()
+# ─── Refresh schedule ───────────────────────────────────────────────────────────
 
-    if not rows:
-        print("No upcoming hearings' missing URLs to backfill.")
-        c.close()
-        return
+CHECK_BUDGET = int(os.getenv("CHECK_BUDGET", "100"))  # detail requests per check_status run
+
+# (days until the hearing, time between checks) – first matching tier wins
+REFRESH_TIERS = [
+    (2,    timedelta(hours=4)),
+    (7,    timedelta(days=1)),
+    (30,   timedelta(days=3)),
+    (None, timedelta(days=7)),
+]
+RECENT_CHANGE = timedelta(days=3)  # recently changed rows are checked as often as imminent ones
+DUE_SLACK     = timedelta(hours=1) # so a row due "tomorrow at 13:00:05" is picked up by the 13:00 run
+
+# When a hearing should be checked again, given its date and last change
+def next_check_at(date_str, last_changed_at, now):
+    days_out = (date.fromisoformat(date_str) - now.date()).days
+    interval = next(step for limit, step in REFRESH_TIERS if limit is None or days_out <= limit)
+    if last_changed_at and now - datetime.fromisoformat(last_changed_at) < RECENT_CHANGE:
+        interval = REFRESH_TIERS[0][1]
+    return (now + interval).isoformat(timespec="seconds")
 
-    print(f"Backfilling URLs for {len(rows)} hearings…")
 
-    for ev_id, api_call in rows:
+# ─── Refresh ────────────────────────────────────────────────────────────────────
+
+# hearings columns in extract.Hearing.fields() order
+FIELDS = ("date", "title", "committee", "URL", "status")
+
+# Columns refresh() needs from each hearings row
+REFRESH_COLUMNS = "id, API_call, date, title, committee, URL, status, content_hash, last_changed_at"
+
+# Fetch each row's detail once and write back only the fields that differ, logging
+# every change in the changes table. All rows are rescheduled, including those whose
+# detail could not be fetched or read, so rows that keep failing (an event removed
+# upstream) wait their turn instead of taking the whole budget on every run.
+# Returns (checked, changes): the ids checked, and the changes as
+# (hearing_id, field, old, new).
+def refresh(conn, rows, now):
+    checked_at = now.isoformat(timespec="seconds")
+    checked, failed, updates, changes, payloads = [], [], {}, [], []
+
+    for ev_id, api_call, *current, stored_hash, last_changed_at in rows:
+        title = current[1]
         try:
-            detail = fetch_event_detail(api_call)            # your existing detail fetcher
-            url    = get_URL(detail)
-            if not url:
-                print(f"still no URL for {ev_id}, skipping")
-                continue
-
-            c.execute("""
-                UPDATE hearings
-                SET url          = ?,
-                WHERE id = ?
-            """, (url, ev_id))
-            print(f"  • Filled URL for {ev_id}: {url}")
-            conn.commit()
+            with metrics.stage("detail_fetch"):
+                detail = fetch_event_detail(api_call)
+            if not detail:
+                raise ValueError("no detail found")
+            payloads.append((ev_id, detail))
+            hearing = normalize(detail)
         except Exception as e:
-            print(f"Error backfilling {ev_id}: {e}")
-    c.close()
-    print("Done backfilling.")
-
-def check_status():
-    # fetch all upcoming meetings 
-    conn = sqlite3.connect("hearings.db")
-    c    = conn.cursor()
-    c.execute("""
-        SELECT id, title, date, API_call, status
+            print(f"Error refreshing {title}: {e}")
+            failed.append((next_check_at(current[0], last_changed_at, now), checked_at, ev_id))
+            continue
+
+        new_hash = hearing.digest()
+        diff = {}
+        if new_hash != stored_hash and new_hash != content_hash(current):
+            for field, old, new in zip(FIELDS, current, hearing.fields()):
+                if (old or "") == (new or ""):
+                    continue
+                if field == "URL" and not new:
+                    continue  # a document link that disappears from the API is kept
+                diff[field] = new
+                changes.append((ev_id, field, old, new))
+                print(f"{field} change for {title}: {old} → {new}")
+            if diff:
+                updates.setdefault(tuple(diff), []).append((*diff.values(), ev_id))
+                last_changed_at = checked_at
+        next_at = next_check_at(diff.get("date", current[0]), last_changed_at, now)
+        checked.append((next_at, checked_at, last_changed_at, new_hash, hearing.fingerprint(), ev_id))
+
+    # Apply the changes and reschedule everything that was checked in one transaction.
+    # Rows changing the same set of columns share one UPDATE statement.
+    with metrics.stage("db_write"), conn:
+        archive_payloads(conn, payloads)
+        for columns, params in updates.items():
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            conn.executemany(f"UPDATE hearings SET {assignments} WHERE id = ?", params)
+        log_changes(conn, changes, checked_at)
+        conn.executemany("""
+            UPDATE hearings
+            SET next_check_at = ?, last_checked_at = ?, last_changed_at = ?, content_hash = ?,
+                fingerprint = ?
+            WHERE id = ?
+        """, checked)
+        conn.executemany("UPDATE hearings SET next_check_at = ?, last_checked_at = ? WHERE id = ?",
+                         failed)
+
+    metrics.count("checked", len(checked))
+    metrics.count("check_failures", len(failed))
+    for field in FIELDS:
+        metrics.count(f"{field.lower()}_changes", sum(1 for change in changes if change[1] == field))
+    return [row[-1] for row in checked], changes
+
+
+# Refresh the most urgent upcoming hearings, spending at most budget detail requests
+def check_status(budget=CHECK_BUDGET):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    conn = get_conn()
+    rows = conn.execute(f"""
+        SELECT {REFRESH_COLUMNS}
         FROM hearings
-        WHERE date(date) >= date('now')
-    """)
-    rows = c.fetchall()
+        WHERE date >= ?
+          AND (next_check_at IS NULL OR next_check_at <= ?)
+        ORDER BY next_check_at IS NOT NULL, next_check_at, date
+        LIMIT ?
+    """, (date.today().isoformat(), (now + DUE_SLACK).isoformat(timespec="seconds"), budget)).fetchall()
     if not rows:
-        print("No upcoming hearings to check status.")
-        conn.close()
+        print("No upcoming hearings due for a status check.")
         return
-    
-    # check if status has changed
-    print(f"Checking status for {len(rows)} upcoming hearings…")
-    for ev_id, title, date_str, api_call, status in rows:
-        try:
-            detail = fetch_event_detail(api_call)
-            if not detail:
-                print(f"No detail found for {title}, skipping")
-                continue 
-
-            new_status = get_status(detail)
-            if new_status == status:
-                # print(f"No status change for {title}")
-                continue
-            else:
-                # status change:
-                print(f"Status change for {title} on {date_str}: {status} → {new_status}")
-                c.execute("""
-                    UPDATE hearings
-                    SET status = ?
-                    WHERE id = ?
-                """, (new_status, ev_id))
-                conn.commit()
-
-                try: 
-                    # if status change, check if date has changed
-                    new_date_obj = get_date(detail) 
-                    new_dt = parse_date(new_date_obj)
-                    new_date_str = new_dt.date().isoformat() 
-
-                    # print (f"Checking date for {title}: {str_date} → {new_date_str}")
-                    if date_str != new_date_str:
-                        print(f"New date found for {title}: {new_date_str}") 
-                        c.execute("""
-                            UPDATE hearings
-                            SET date = ?
-                            WHERE id = ?
-                        """, (new_date_str, ev_id))
-                        conn.commit()
-                    else: 
-                        continue
-                except Exception as e:
-                    print(f"Error parsing date for {title}, skipping")
-                    continue
 
-        except Exception as e:
-            print(f"Error updating date for {title}: {e}")
+    print(f"Checking status for {len(rows)} upcoming hearings (budget {budget})…")
+    checked, changes = refresh(conn, rows, now)
+    print(f"Checked {len(checked)} of {len(rows)} hearings: {len(changes)} fields changed "
+          f"in {len({change[0] for change in changes})} hearings.")
+    return changes
+
 
-    # update_date()
+# Refresh upcoming hearings that still have no URL. Rows check_status already
+# refreshed today are skipped, so running both costs one detail request per hearing.
+def backfill_missing_urls():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    conn = get_conn()
+    rows = conn.execute(f"""
+        SELECT {REFRESH_COLUMNS}
+        FROM hearings
+        WHERE (url IS NULL OR url = '')
+          AND date >= ?
+          AND (last_checked_at IS NULL OR last_checked_at < ?)
+    """, (date.today().isoformat(), now.date().isoformat())).fetchall()
+
+    if not rows:
+        print("No upcoming hearings' missing URLs to backfill.")
+        return
 
-    conn.close()
+    print(f"Backfilling URLs for {len(rows)} hearings…")
+    _, changes = refresh(conn, rows, now)
+    filled = sum(1 for change in changes if change[1] == "URL")
+    metrics.count("urls_filled", filled)
+    print(f"Done backfilling: {filled} of {len(rows)} URLs filled.")
+    return changes
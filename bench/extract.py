@@ -0,0 +1,100 @@
+"""
+Micro-benchmark of detail payload extraction.
+
+    python -m bench.extract [--db /app/data/hearings.db] [--scale 2000]
+
+Times the old extraction path (the separate extract.get_* accessors plus a
+strptime loop over date formats) against extract.normalize() over a corpus of payload shapes: the samples in
+bench/payloads.json (repeated --scale times with varied dates) plus, with --db,
+every payload archived in that database. Checks both paths agree.
+"""
+import argparse
+import copy
+import json
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from db import unpack
+import extract
+from extract import get_committee, get_date, get_status, get_title, get_URL, normalize
+
+
+SAMPLES = Path(__file__).with_name("payloads.json")
+
+
+# Sample payloads unwrapped from their {"hearing": …} / {"committeeMeeting": …} envelope,
+# repeated with dates spread over a year so the date cache sees realistic reuse
+def load_corpus(scale, db_path=None):
+    samples = [p.get("hearing") or p.get("committeeMeeting") for p in json.loads(SAMPLES.read_text())]
+    corpus = []
+    for i in range(scale):
+        day = (date(2025, 1, 1) + timedelta(days=i % 365)).isoformat()
+        for sample in samples:
+            detail = copy.deepcopy(sample)
+            if "date" in detail:
+                detail["date"] = f"{day}T14:00:00Z" if "T" in detail["date"] else day
+            else:
+                detail["dates"][0]["date"] = day
+            corpus.append(detail)
+
+    if db_path:
+        conn = sqlite3.connect(db_path)
+        corpus += [unpack(body) for (body,) in conn.execute("SELECT body FROM payloads")]
+    return corpus
+
+
+# The date parser extract.py used before the single-pass normalizer
+def strptime_date(s):
+    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(s, fmt)
+        except:
+            continue
+    raise ValueError(f"Unrecognized date format: {s!r}")
+
+def accessors(detail):
+    return (strptime_date(get_date(detail)).date().isoformat(), get_title(detail),
+            get_committee(detail), get_URL(detail), get_status(detail))
+
+def single_pass(detail):
+    return normalize(detail).fields()
+
+def run(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        extract._parse_date.cache_clear()
+        extract._parse_day.cache_clear()
+        start = time.perf_counter()
+        for detail in corpus:
+            try:
+                fn(detail)
+            except ValueError:
+                pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=2000, help="copies of each sample payload")
+    parser.add_argument("--db", help="also include payloads archived in this hearings.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.scale, args.db)
+    for detail in corpus:
+        try:
+            assert accessors(detail) == single_pass(detail), detail
+        except ValueError:
+            pass
+
+    print(f"{len(corpus)} payloads, best of {args.repeat}")
+    for name, fn in (("accessors", accessors), ("normalize", single_pass)):
+        elapsed = run(fn, corpus, args.repeat)
+        print(f"{name:<10} {elapsed * 1000:8.1f} ms  {elapsed / len(corpus) * 1e6:6.2f} us/payload")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+End-to-end benchmark of hearing_bot.py commands against bench/server.py.
+
+    python -m bench.run --sizes 100,1000,10000,50000 --latency-ms 5 --rate-limit 0.01
+
+For each dataset size a fresh fixture server and an empty data directory are
+created, then each command runs in its own interpreter, in order. Reported per
+command: wall time, Congress.gov requests, Slack requests, 429s, rows written
+to SQLite and peak RSS.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+
+ROOT     = Path(__file__).resolve().parent.parent
+COMMANDS = ["update", "check_status", "backfill", "upcoming", "last_update"]
+API_KEYS = ("hearing_list", "meeting_list", "hearing_detail", "meeting_detail")
+
+
+# ─── Fixture server ────────────────────────────────────────────────────────────
+
+def start_server(port, size, latency_ms, rate_limit):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "bench.server", "--port", str(port), "--size", str(size),
+         "--latency-ms", str(latency_ms), "--rate-limit", str(rate_limit)],
+        cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            server_call(port, "/_stats")
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("fixture server did not start")
+
+def server_call(port, path, method="GET"):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    with urllib.request.urlopen(req, timeout=5) as r:
+        return json.load(r)
+
+
+# ─── Commands ──────────────────────────────────────────────────────────────────
+
+# Run one command in a fresh interpreter; returns its measurements
+def run_command(command, port, data_dir):
+    env = {
+        **os.environ,
+        "DATABASE_PATH":     str(data_dir / "hearings.db"),
+        "CONGRESS_API_BASE": f"http://127.0.0.1:{port}/v3",
+        "CONGRESS_API_KEY":  "bench",
+        "SLACK_API_URL":     f"http://127.0.0.1:{port}/api/",
+        "SLACK_TOKEN":       "xoxb-bench",
+        "SLACK_POST_RATE":   os.getenv("SLACK_POST_RATE", "50"),  # Slack's real ~1/s would dominate
+        "API_QUOTA":         os.getenv("API_QUOTA", "1000000"),   # so does Congress.gov's 5000/h
+        "PYTHONUNBUFFERED":  "1",
+    }
+    server_call(port, "/_reset", "POST")
+    log = data_dir / f"{command}.log"
+
+    start = time.perf_counter()
+    with open(log, "w") as out:
+        proc = subprocess.Popen([sys.executable, "hearing_bot.py", command],
+                                cwd=ROOT, env=env, stdout=out, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+
+    stats  = server_call(port, "/_stats")
+    output = log.read_text()
+    writes = re.search(r"DB rows written: (\d+)", output)
+    return {
+        "command":   command,
+        "exit":      os.waitstatus_to_exitcode(status),
+        "wall_s":    round(wall, 3),
+        "api_calls": sum(stats.get(k, 0) for k in API_KEYS),
+        "slack":     stats.get("chat.postMessage", 0) + stats.get("chat.update", 0),
+        "429s":      stats.get("429", 0),
+        "db_writes": int(writes.group(1)) if writes else None,
+        "peak_mb":   round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is in KiB on Linux
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    parser.add_argument("--commands", default=",".join(COMMANDS))
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'size':>6} {'command':<13} {'wall s':>8} {'api':>7} {'slack':>6} "
+          f"{'429s':>5} {'writes':>8} {'peak MB':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        server = start_server(args.port, size, args.latency_ms, args.rate_limit)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                for command in args.commands.split(","):
+                    r = {"size": size, **run_command(command, args.port, Path(tmp))}
+                    results.append(r)
+                    flag = "" if r["exit"] == 0 else f"  (exit {r['exit']})"
+                    print(f"{size:>6} {command:<13} {r['wall_s']:>8.2f} {r['api_calls']:>7} "
+                          f"{r['slack']:>6} {r['429s']:>5} {r['db_writes'] or 0:>8} "
+                          f"{r['peak_mb']:>8.1f}{flag}", flush=True)
+        finally:
+            server.kill()
+            server.wait()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Local stand-in for the Congress.gov v3 API and the Slack Web API.
+
+    python -m bench.server --port 8765 --size 1000 --latency-ms 20 --rate-limit 0.01
+
+Serves a generated dataset of ``--size`` events (half hearings, half committee
+meetings) on the listing and detail endpoints the bot uses, plus
+``chat.postMessage`` / ``chat.update``. Every request can be delayed by
+``--latency-ms`` and a ``--rate-limit`` fraction of them answered with 429;
+``--detail-errors`` makes that fraction of events' first detail request a 500.
+
+GET /_stats returns request counts per endpoint, POST /_reset clears them.
+Point the bot at it with CONGRESS_API_BASE=http://127.0.0.1:8765/v3 and
+SLACK_API_URL=http://127.0.0.1:8765/api/.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+CONGRESS    = 119
+UPDATE_DATE = "2025-01-01T00:00:00Z"
+COMMITTEES  = [
+    "House Judiciary",
+    "House Energy and Commerce",
+    "House Natural Resources",
+    "House Natural Resources Subcommittee on Water, Wildlife and Fisheries",
+    "Senate Indian Affairs (Select) Committee",
+    "Senate Energy and Natural Resources",
+    "Senate Commerce, Science, and Transportation",
+    "Senate Judiciary Subcommittee on the Constitution",
+]
+
+
+# ─── Dataset ───────────────────────────────────────────────────────────────────
+
+# Event i of the dataset: even ids are hearings, odd ids committee meetings.
+# Dates spread from 60 days ago to 90 days ahead; every 7th event has no document URL.
+def event(i, base_url):
+    kind    = "hearing" if i % 2 == 0 else "meeting"
+    ev_id   = str(100000 + i)
+    day     = (date.today() + timedelta(days=(i * 7) % 150 - 60)).isoformat()
+    path    = "hearing" if kind == "hearing" else "committee-meeting"
+    api_url = f"{base_url}/v3/{path}/{CONGRESS}/house/{ev_id}?format=json"
+    return kind, ev_id, day, api_url
+
+def listing_item(i, base_url):
+    kind, ev_id, _, api_url = event(i, base_url)
+    id_key = "jacketNumber" if kind == "hearing" else "eventId"
+    return {id_key: int(ev_id) if kind == "hearing" else ev_id, "chamber": "House",
+            "congress": CONGRESS, "updateDate": UPDATE_DATE, "url": api_url}
+
+def detail(i, base_url):
+    kind, ev_id, day, _ = event(i, base_url)
+    docs = [] if i % 7 == 0 else [{"url": f"https://example.gov/docs/{ev_id}.pdf"}]
+    body = {
+        "title":      f"Hearing {ev_id} on matters before the committee",
+        "committees": [{"name": COMMITTEES[i % len(COMMITTEES)]}],
+        "updateDate": UPDATE_DATE,
+    }
+    if kind == "hearing":
+        formats = [{"type": "PDF", **d} for d in docs] + [{"type": "Formatted Text", **d} for d in docs]
+        body.update(jacketNumber=int(ev_id), dates=[{"date": day}], formats=formats)
+        return {"hearing": body}
+    body.update(eventId=ev_id, date=f"{day}T14:00:00Z", meetingStatus="Scheduled", meetingDocuments=docs)
+    return {"committeeMeeting": body}
+
+
+# ─── Server ────────────────────────────────────────────────────────────────────
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload=None, headers=()):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _throttled(self, endpoint):
+        server = self.server
+        with server.lock:
+            server.stats[endpoint] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.rate_limit and server.random.random() < server.rate_limit:
+            with server.lock:
+                server.stats["429"] += 1
+            self._send(429, {"error": "rate limited"}, [("Retry-After", str(server.retry_after))])
+            return True
+        return False
+
+    def do_GET(self):
+        server = self.server
+        url    = urlparse(self.path)
+        parts  = url.path.strip("/").split("/")
+
+        if url.path == "/_stats":
+            with server.lock:
+                return self._send(200, dict(server.stats))
+
+        if len(parts) == 3 and parts[0] == "v3" and parts[1] in ("hearing", "committee-meeting"):
+            return self._listing(parts[1], parse_qs(url.query))
+        if len(parts) == 5 and parts[0] == "v3" and parts[1] in ("hearing", "committee-meeting"):
+            return self._detail(parts[1], parts[4])
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        path   = urlparse(self.path).path
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if path == "/_reset":
+            with server.lock:
+                server.stats.clear()
+            return self._send(200, {"ok": True})
+        if path in ("/api/chat.postMessage", "/api/chat.update"):
+            method = path.rsplit("/", 1)[1]
+            if self._throttled(method):
+                return
+            return self._send(200, {"ok": True, "channel": "C0BENCH", "ts": f"{time.time():.6f}"})
+        self._send(404, {"ok": False, "error": "unknown_method"})
+
+    def _listing(self, path, query):
+        kind = "hearing" if path == "hearing" else "meeting"
+        if self._throttled(f"{kind}_list"):
+            return
+        server = self.server
+        offset = int(query.get("offset", ["0"])[0])
+        limit  = int(query.get("limit", ["20"])[0])
+        since  = query.get("fromDateTime", [None])[0]
+
+        parity = 0 if kind == "hearing" else 1
+        ids    = [] if since and since > UPDATE_DATE else range(parity, server.size, 2)
+        page   = [listing_item(i, server.base_url) for i in ids[offset:offset + limit]]
+        key    = "hearings" if kind == "hearing" else "committeeMeetings"
+
+        pagination = {"count": len(ids)}
+        if offset + limit < len(ids):
+            pagination["next"] = f"{server.base_url}/v3/{path}/{CONGRESS}?offset={offset + limit}&limit={limit}"
+        self._send(200, {key: page, "pagination": pagination})
+
+    def _detail(self, path, ev_id):
+        kind = "hearing" if path == "hearing" else "meeting"
+        if self._throttled(f"{kind}_detail"):
+            return
+        i = int(ev_id) - 100000
+        if not 0 <= i < self.server.size:
+            return self._send(404, {"error": "not found"})
+
+        if self.server.detail_errors:
+            with self.server.lock:
+                first = ev_id not in self.server.requested
+                fail  = first and self.server.random.random() < self.server.detail_errors
+                self.server.requested.add(ev_id)
+            if fail:
+                return self._send(500, {"error": "internal error"})
+
+        etag = f'"{ev_id}-{UPDATE_DATE}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers=[("ETag", etag)])
+        self._send(200, detail(i, self.server.base_url), [("ETag", etag)])
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads     = True
+    request_queue_size = 128  # the bot opens FETCH_WORKERS connections at once
+
+
+def make_server(port=8765, size=1000, latency_ms=0, rate_limit=0.0, retry_after=1, seed=0,
+                detail_errors=0.0):
+    server = Server(("127.0.0.1", port), Handler)
+    server.base_url    = f"http://127.0.0.1:{server.server_address[1]}"
+    server.size        = size
+    server.latency     = latency_ms / 1000
+    server.rate_limit  = rate_limit
+    server.retry_after = retry_after
+    server.detail_errors = detail_errors
+    server.requested   = set()   # events whose detail was requested once already
+    server.random      = random.Random(seed)
+    server.stats       = Counter()
+    server.lock        = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size", type=int, default=1000, help="number of events")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--detail-errors", type=float, default=0,
+                        help="fraction of events whose first detail request fails with 500")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.size, args.latency_ms, args.rate_limit, args.retry_after,
+                         detail_errors=args.detail_errors)
+    print(f"Serving {args.size} events on {server.base_url}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
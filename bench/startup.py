@@ -0,0 +1,68 @@
+"""
+Cold-start import budget for each hearing_bot.py subcommand.
+
+Run from the repository root:
+
+    python -m bench.startup
+
+Each subcommand's modules (hearing_bot.COMMAND_IMPORTS) are imported in a fresh
+interpreter under ``-X importtime``. The time spent above a bare interpreter is
+compared with the budget below and the script exits non-zero on a regression.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+from hearing_bot import COMMAND_IMPORTS
+
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 3  # best of RUNS, cold starts are noisy
+
+# Milliseconds of imports allowed per subcommand, on top of the bare interpreter
+BUDGETS_MS = {
+    "check_status": 250,
+    "backfill":     250,
+    "update":       300,
+    "upcoming":     175,
+    "last_update":  175,
+    "reextract":    100,
+    "search":       100,
+    "crawl":        300,
+}
+
+
+# Total import time (ms) reported by -X importtime for a snippet of code
+def import_time(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        total_us += int(line.split(":", 1)[1].split("|")[0])
+    return total_us / 1000
+
+def best_of(code):
+    return min(import_time(code) for _ in range(RUNS))
+
+
+def main():
+    baseline = best_of("pass")
+    failed = False
+
+    print(f"{'command':<14} {'ms':>8} {'budget':>8}")
+    for command, modules in COMMAND_IMPORTS.items():
+        elapsed = best_of(f"import hearing_bot, {', '.join(modules)}") - baseline
+        budget  = BUDGETS_MS[command]
+        over    = elapsed > budget
+        failed |= over
+        print(f"{command:<14} {elapsed:>8.1f} {budget:>8} {'OVER BUDGET' if over else ''}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from db import DATABASE_PATH
+
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+# Lives next to hearings.db so it shares the Fly volume
+CACHE_PATH      = os.getenv("CACHE_PATH", str(Path(DATABASE_PATH).with_name("http_cache.db")))
+CACHE_TTL       = int(os.getenv("CACHE_TTL", 3600))                # served without asking the API
+CACHE_EXPIRE    = int(os.getenv("CACHE_EXPIRE", 14 * 24 * 3600))   # dropped when unused this long
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+EVICT_EVERY     = 100  # stores between eviction passes
+
+stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0, "errors": 0}
+
+_lock   = threading.Lock()
+_conn   = None
+_stores = 0
+
+
+# ─── Storage ──────────────────────────────────────────────────────────────────
+
+# Shared by every cron process like hearings.db, so opened the same way as
+# db.get_conn(): WAL, and writers wait for each other instead of failing
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(CACHE_PATH, timeout=30, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode = WAL")
+        _conn.execute("PRAGMA synchronous = NORMAL")
+        _conn.execute("PRAGMA busy_timeout = 30000")
+        with _conn:
+            _conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url           TEXT PRIMARY KEY,
+                    body          TEXT NOT NULL,
+                    etag          TEXT,
+                    last_modified TEXT,
+                    fetched_at    REAL NOT NULL,
+                    used_at       REAL NOT NULL,
+                    size          INTEGER NOT NULL
+                )
+                """)
+            _conn.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+    return _conn
+
+
+# The cache only saves requests: a failing cache database is logged and the
+# request goes to the API uncached, rather than losing the response
+def _failed(action, url, e):
+    with _lock:
+        stats["errors"] += 1
+    print(f"HTTP cache {action} failed for {url}: {e}")
+
+# Look up url, returns (body, etag, last_modified, fresh) or None.
+# A fresh entry can be used as is; a stale one needs a conditional request.
+def lookup(url):
+    try:
+        return _lookup(url)
+    except sqlite3.Error as e:
+        _failed("lookup", url, e)
+        return None
+
+def _lookup(url):
+    now = time.time()
+    with _lock, _db() as conn:
+        row = conn.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            stats["misses"] += 1
+            return None
+
+        body, etag, last_modified, fetched_at = row
+        fresh = now - fetched_at < CACHE_TTL
+        if fresh:
+            stats["hits"] += 1
+            conn.execute("UPDATE responses SET used_at = ? WHERE url = ?", (now, url))
+    return body, etag, last_modified, fresh
+
+# The API answered 304 for a stale entry: restart its TTL
+def revalidated(url):
+    now = time.time()
+    try:
+        with _lock, _db() as conn:
+            stats["revalidated"] += 1
+            conn.execute("UPDATE responses SET fetched_at = ?, used_at = ? WHERE url = ?", (now, now, url))
+    except sqlite3.Error as e:
+        _failed("revalidation", url, e)
+
+def store(url, body, etag=None, last_modified=None):
+    try:
+        _store(url, body, etag, last_modified)
+    except sqlite3.Error as e:
+        _failed("store", url, e)
+
+def _store(url, body, etag, last_modified):
+    global _stores
+    now = time.time()
+    with _lock, _db() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, used_at, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (url, body, etag, last_modified, now, now, len(body)))
+        _stores += 1
+        due = _stores % EVICT_EVERY == 0
+    if due:
+        evict()
+
+
+# ─── Eviction ─────────────────────────────────────────────────────────────────
+
+# Drop entries unused for CACHE_EXPIRE, then least recently used ones over CACHE_MAX_BYTES
+def evict():
+    with _lock, _db() as conn:
+        removed = conn.execute(
+            "DELETE FROM responses WHERE used_at < ?", (time.time() - CACHE_EXPIRE,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > CACHE_MAX_BYTES:
+            drop, excess = [], total - CACHE_MAX_BYTES
+            for url, size in conn.execute("SELECT url, size FROM responses ORDER BY used_at"):
+                if excess <= 0:
+                    break
+                drop.append((url,))
+                excess -= size
+            conn.executemany("DELETE FROM responses WHERE url = ?", drop)
+            removed += len(drop)
+
+        stats["evicted"] += removed
+    return removed
+
+def summary():
+    return ", ".join(f"{name} {count}" for name, count in stats.items())
@@ -0,0 +1,62 @@
+import json
+import os
+import re
+from functools import lru_cache
+from excluded import irrelevant_hearings, irrelevant_prefixes
+
+
+# Optional JSON file replacing the lists in excluded.py:
+#   {"committees": ["House Agriculture", ...], "prefixes": ["Senate Indian", ...]}
+EXCLUDED_CONFIG = os.getenv("EXCLUDED_CONFIG", "excluded.json")
+
+_SUBCOMMITTEE = " subcommittee on "
+_SUFFIXES     = re.compile(r"(\s+\(select\))?(\s+committee)?$")
+
+
+# Compare names case-insensitively and ignore "(Select)" / "Committee" suffixes,
+# so "Senate Agriculture Committee" and "Senate Agriculture" are the same rule
+def normalize(name):
+    name = " ".join(name.casefold().split())
+    return _SUFFIXES.sub("", name)
+
+
+class CommitteeFilter:
+    """
+    Excludes a committee when:
+      - its normalized name is listed,
+      - it is a subcommittee of a listed committee ("<parent> Subcommittee on …"), or
+      - its normalized name starts with a listed prefix.
+    """
+    __slots__ = ("committees", "prefixes")
+
+    def __init__(self, committees, prefixes=()):
+        self.committees = frozenset(normalize(c) for c in committees)
+        self.prefixes   = tuple(normalize(p) for p in prefixes)
+
+    def excludes(self, committee):
+        if not committee:
+            return False
+        name = normalize(committee)
+        if name in self.committees:
+            return True
+        parent, sep, _ = name.partition(_SUBCOMMITTEE)
+        if sep and normalize(parent) in self.committees:
+            return True
+        return bool(self.prefixes) and name.startswith(self.prefixes)
+
+
+# Build the filter from EXCLUDED_CONFIG if present, otherwise from excluded.py
+def load_filter(path=EXCLUDED_CONFIG):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            config = json.load(f)
+        print(f"Loaded committee filter from {path}")
+        return CommitteeFilter(config.get("committees", []), config.get("prefixes", []))
+    return CommitteeFilter(irrelevant_hearings, irrelevant_prefixes)
+
+@lru_cache(maxsize=1)
+def get_filter():
+    return load_filter()
+
+def is_excluded(committee):
+    return get_filter().excludes(committee)
@@ -0,0 +1,109 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from db import get_conn
+from fetch import CONGRESS, PAGE_SIZE, fetch_page
+from post import post_slack
+from update import store_events
+
+
+LIST_WORKERS = int(os.getenv("CRAWL_LIST_WORKERS", "4"))  # listing pages requested at once
+
+
+# ─── Checkpoints ────────────────────────────────────────────────────────────────
+
+# Page offsets only name the same events while a listing doesn't change, i.e. for a
+# closed Congress. A live Congress's listing reorders as events are updated, so its
+# crawls walk every page again; stored events are skipped before their detail
+# request, which keeps a resumed crawl cheap.
+def checkpointed(congress):
+    return congress < CONGRESS
+
+def crawled_offsets(conn, congress, kind):
+    return {row[0] for row in conn.execute(
+        "SELECT page_offset FROM crawl_pages WHERE congress = ? AND kind = ?", (congress, kind))}
+
+def mark_crawled(conn, congress, kind, offset, events):
+    conn.execute("""
+        INSERT OR REPLACE INTO crawl_pages (congress, kind, page_offset, events, crawled_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (congress, kind, offset, events, datetime.now(timezone.utc).isoformat(timespec="seconds")))
+
+
+# ─── Crawl ──────────────────────────────────────────────────────────────────────
+
+# Store one listing page: details for the events not in the database yet (the
+# fetch pool bounds concurrency), then rows, payloads and the page checkpoint in one
+# transaction. Memory is bounded by the page, not by the size of the crawl. Events
+# whose detail request fails are retried by the next update.
+# Returns (inserted, upcoming, alerts) like update.store_events.
+def store_page(conn, congress, kind, offset, events):
+    checkpoint = None
+    if checkpointed(congress):
+        checkpoint = lambda: mark_crawled(conn, congress, kind, offset, len(events))
+    return store_events(conn, kind, events, checkpoint)
+
+# Every page of one listing, in all statuses. The first page gives the total, the
+# remaining ones are requested LIST_WORKERS at a time while earlier pages are stored.
+# Upcoming hearings and keyword matches found are added to found (see crawl()).
+def crawl_listing(conn, congress, kind, found, workers=LIST_WORKERS):
+    done = crawled_offsets(conn, congress, kind) if checkpointed(congress) else set()
+
+    first, _, total = fetch_page(kind, 0, congress, status=None)
+    total = total or len(first)
+    offsets = [o for o in range(0, total, PAGE_SIZE) if o not in done]
+    print(f"Congress {congress} {kind}s: {total} events, {len(offsets)} of "
+          f"{-(-total // PAGE_SIZE)} pages left")
+
+    inserted = 0
+    if 0 in offsets:
+        inserted += collect(found, store_page(conn, congress, kind, 0, first))
+        offsets.remove(0)
+
+    # At most `workers` pages are in flight or waiting, so listings stay just ahead of storage
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for offset in offsets:
+            pending.append((offset, pool.submit(fetch_page, kind, offset, congress, status=None)))
+            if len(pending) < workers:
+                continue
+            inserted += store_next(conn, congress, kind, pending, total, found)
+        while pending:
+            inserted += store_next(conn, congress, kind, pending, total, found)
+    return inserted
+
+def store_next(conn, congress, kind, pending, total, found):
+    offset, future = pending.popleft()
+    events = future.result()[0]
+    inserted = collect(found, store_page(conn, congress, kind, offset, events))
+    print(f"  {kind}s {offset + len(events)}/{total}: {inserted} new")
+    return inserted
+
+def collect(found, stored):
+    inserted, upcoming, matched = stored
+    found[0].extend(upcoming)
+    for channel, row in matched:
+        found[1].setdefault(channel, []).append(row)
+    return inserted
+
+# Harvest every hearing and committee meeting of the given Congresses. Re-running
+# an interrupted crawl of a closed Congress resumes at the first page not stored.
+# Returns (daily_messages, alerts) like update.update(): a crawl of the current
+# Congress can store upcoming hearings that update will never list as new.
+def crawl(congresses):
+    conn = get_conn()
+    inserted = 0
+    found = ([], {})  # (upcoming rows, {channel: rows})
+    for congress in congresses:
+        for kind in ("hearing", "meeting"):
+            try:
+                inserted += crawl_listing(conn, congress, kind, found)
+            except Exception as e:
+                print(f"Error crawling congress {congress} {kind}s: {e}")
+    print(f"Crawl finished: {inserted} hearings stored, {len(found[0])} upcoming.")
+
+    upcoming, alerts = found
+    daily_messages = post_slack(upcoming) if upcoming else {}
+    return daily_messages, {channel: post_slack(rows) for channel, rows in alerts.items()}
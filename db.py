@@ -0,0 +1,507 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from dotenv import load_dotenv
+
+
+load_dotenv(dotenv_path=Path('.') / '.env')
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "/app/data/hearings.db")
+
+
+# Bumped whenever a data migration is added to MIGRATIONS
+SCHEMA_VERSION = 4
+
+_conn = None
+_conn_lock = threading.Lock()
+
+
+# ─── Connection ─────────────────────────────────────────────────────────────────
+
+# Counts the rows the bot's own statements insert, update or delete, through the
+# connection or any of its cursors. Unlike total_changes this leaves out what the
+# rev and full-text triggers write.
+class Cursor(sqlite3.Cursor):
+    def execute(self, sql, params=()):
+        super().execute(sql, params)
+        self.connection.rows_written += max(self.rowcount, 0)
+        return self
+
+    def executemany(self, sql, params):
+        super().executemany(sql, params)
+        self.connection.rows_written += max(self.rowcount, 0)
+        return self
+
+class Connection(sqlite3.Connection):
+    rows_written = 0
+
+    def cursor(self, factory=Cursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, params):
+        return self.cursor().executemany(sql, params)
+
+# Shared connection to DATABASE_PATH, opened, configured and migrated on first use.
+# WAL lets the cron jobs read while another one writes; busy_timeout makes
+# concurrent writers wait instead of failing with "database is locked".
+def get_conn():
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            conn = sqlite3.connect(
+                DATABASE_PATH,
+                timeout=30,
+                check_same_thread=False,
+                cached_statements=256,
+                factory=Connection,
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 30000")
+            init_db(conn)
+            _conn = conn
+    return _conn
+
+def close():
+    global _conn
+    with _conn_lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+# ─── Schema ─────────────────────────────────────────────────────────────────────
+
+# Create the tables the bot relies on if they don't exist yet
+def init_db(conn):
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS hearings (
+                id        TEXT PRIMARY KEY,
+                date      TEXT,
+                title     TEXT,
+                committee TEXT,
+                URL       TEXT,
+                API_call  TEXT,
+                date_inserted TEXT,
+                status    TEXT
+            )
+            """)
+        _add_columns(conn, "hearings", {
+            "next_check_at":   "TEXT",   # when check_status should look at the row again
+            "last_checked_at": "TEXT",
+            "last_changed_at": "TEXT",   # last time a refresh saw any field change
+            "content_hash":    "TEXT",   # extract.Hearing.digest() of the last extracted payload
+            "rev":             "INTEGER",  # bumped by the triggers below whenever a row's fields change
+            "fingerprint":     "TEXT",     # extract.Hearing.fingerprint(), shared by cross-endpoint duplicates
+        })
+        # One row per listing kind ("hearing" / "meeting"):
+        #   cursor      – updateDate high-water mark of the last completed sweep
+        #   window_end  – upper bound of the sweep in progress (NULL when idle)
+        #   page_offset – listing offset reached by the sweep in progress
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                kind        TEXT PRIMARY KEY,
+                cursor      TEXT,
+                window_end  TEXT,
+                page_offset INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+        # Raw detail payloads (zlib-compressed JSON), one row per distinct version
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS payloads (
+                event_id   TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                digest     TEXT NOT NULL,
+                body       BLOB NOT NULL,
+                PRIMARY KEY (event_id, fetched_at)
+            )
+            """)
+
+        # Ids of duplicates merged into a stored hearing: the other endpoint's id for the
+        # same event, learnt from cross-references or from a matching fingerprint
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias        TEXT PRIMARY KEY,
+                canonical_id TEXT NOT NULL,
+                source       TEXT NOT NULL,
+                created_at   TEXT NOT NULL
+            )
+            """)
+        # Slack messages of the edit-in-place digests, one row per (digest, channel, date).
+        # ts is a JSON list (a long date can span several messages).
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS digests (
+                kind         TEXT NOT NULL,
+                channel      TEXT NOT NULL,
+                date         TEXT NOT NULL,
+                channel_id   TEXT NOT NULL,
+                ts           TEXT NOT NULL,
+                rows_hash    TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                posted_at    TEXT NOT NULL,
+                PRIMARY KEY (kind, channel, date)
+            )
+            """)
+        # Listing pages a crawl has stored, so an interrupted crawl skips them on resume
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_pages (
+                congress    INTEGER NOT NULL,
+                kind        TEXT NOT NULL,
+                page_offset INTEGER NOT NULL,
+                events      INTEGER NOT NULL,
+                crawled_at  TEXT NOT NULL,
+                PRIMARY KEY (congress, kind, page_offset)
+            )
+            """)
+        # Events whose detail request failed, retried by the next update (the listing
+        # cursor has moved past them, so they would otherwise never be listed again)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS failed_events (
+                id        TEXT PRIMARY KEY,
+                kind      TEXT NOT NULL,
+                api_call  TEXT NOT NULL,
+                attempts  INTEGER NOT NULL,
+                failed_at TEXT NOT NULL
+            )
+            """)
+        # One row per field a refresh changed, oldest first
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                id         INTEGER PRIMARY KEY,
+                hearing_id TEXT NOT NULL,
+                field      TEXT NOT NULL,
+                old        TEXT,
+                new        TEXT,
+                changed_at TEXT NOT NULL
+            )
+            """)
+
+        # When serve's scheduler last ran each slot ("check_status, update, backfill"),
+        # so a restart can catch up on a slot it missed
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schedule_runs (
+                slot   TEXT PRIMARY KEY,
+                ran_at TEXT NOT NULL
+            )
+            """)
+
+        _create_fts(conn)
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migrate in MIGRATIONS[version:]:
+            migrate(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # Reads filter on the bare columns (date >= ?), so these give range scans
+        conn.execute("CREATE INDEX IF NOT EXISTS hearings_date ON hearings (date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS hearings_date_inserted ON hearings (date_inserted)")
+        conn.execute("CREATE INDEX IF NOT EXISTS hearings_status ON hearings (status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS changes_changed_at ON changes (changed_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS hearings_rev ON hearings (rev)")
+        conn.execute("CREATE INDEX IF NOT EXISTS hearings_fingerprint ON hearings (fingerprint)")
+
+        # Every insert, and every update of a displayed field, moves the row to the
+        # next revision, so readers can fetch just the rows changed since they last looked
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS hearings_rev_insert AFTER INSERT ON hearings
+            BEGIN
+                UPDATE hearings SET rev = (SELECT IFNULL(MAX(rev), 0) + 1 FROM hearings)
+                WHERE rowid = NEW.rowid;
+            END
+            """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS hearings_rev_update
+            AFTER UPDATE OF date, title, committee, URL, status ON hearings
+            BEGIN
+                UPDATE hearings SET rev = (SELECT IFNULL(MAX(rev), 0) + 1 FROM hearings)
+                WHERE rowid = NEW.rowid;
+            END
+            """)
+
+
+# Full-text index over title and committee (external content: the text stays in
+# hearings, triggers keep the index in step). Skipped if SQLite lacks FTS5.
+def _create_fts(conn):
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS hearings_fts
+            USING fts5(title, committee, content='hearings', content_rowid='rowid')
+            """)
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable: {e}")
+        return
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS hearings_fts_insert AFTER INSERT ON hearings
+        BEGIN
+            INSERT INTO hearings_fts (rowid, title, committee) VALUES (NEW.rowid, NEW.title, NEW.committee);
+        END
+        """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS hearings_fts_delete AFTER DELETE ON hearings
+        BEGIN
+            INSERT INTO hearings_fts (hearings_fts, rowid, title, committee)
+            VALUES ('delete', OLD.rowid, OLD.title, OLD.committee);
+        END
+        """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS hearings_fts_update AFTER UPDATE OF title, committee ON hearings
+        BEGIN
+            INSERT INTO hearings_fts (hearings_fts, rowid, title, committee)
+            VALUES ('delete', OLD.rowid, OLD.title, OLD.committee);
+            INSERT INTO hearings_fts (rowid, title, committee) VALUES (NEW.rowid, NEW.title, NEW.committee);
+        END
+        """)
+
+def _has_fts(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hearings_fts'"
+    ).fetchone() is not None
+
+# Add any missing columns to an existing table (older volumes predate them)
+def _add_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+# ─── Migrations ─────────────────────────────────────────────────────────────────
+
+# v1: store date and date_inserted as plain "YYYY-MM-DD" so they compare as text
+def _normalize_dates(conn):
+    for column in ("date", "date_inserted"):
+        conn.execute(f"""
+            UPDATE hearings
+            SET {column} = date({column})
+            WHERE date({column}) IS NOT NULL AND {column} != date({column})
+        """)
+
+# v2: give existing rows a revision (new and changed rows get one from the triggers)
+def _number_revisions(conn):
+    conn.execute("UPDATE hearings SET rev = rowid WHERE rev IS NULL")
+
+# v3: index the rows stored before hearings_fts existed
+def _index_fts(conn):
+    if _has_fts(conn):
+        conn.execute("INSERT INTO hearings_fts (hearings_fts) VALUES ('rebuild')")
+
+# v4: fingerprint the rows stored before the dedup index existed
+def _fingerprint_rows(conn):
+    from extract import Hearing
+
+    rows = conn.execute("SELECT id, date, title, committee, URL, status FROM hearings").fetchall()
+    conn.executemany("UPDATE hearings SET fingerprint = ? WHERE id = ?",
+                     [(Hearing(*fields).fingerprint(), ev_id) for ev_id, *fields in rows])
+
+MIGRATIONS = [_normalize_dates, _number_revisions, _index_fts, _fingerprint_rows]
+
+
+# ─── Listing cursor ─────────────────────────────────────────────────────────────
+
+# Start (or resume) a listing sweep for kind, returns (since, until, offset)
+def begin_sync(conn, kind):
+    row = conn.execute(
+        "SELECT cursor, window_end, page_offset FROM sync_state WHERE kind = ?", (kind,)
+    ).fetchone()
+    cursor, window_end, offset = row if row else (None, None, 0)
+
+    if window_end:
+        print(f"Resuming {kind} sweep at offset {offset} (since {cursor or 'the beginning'})")
+        return cursor, window_end, offset
+
+    window_end = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    with conn:
+        conn.execute("""
+            INSERT INTO sync_state (kind, cursor, window_end, page_offset)
+            VALUES (?, ?, ?, 0)
+            ON CONFLICT(kind) DO UPDATE SET window_end = excluded.window_end, page_offset = 0
+        """, (kind, cursor, window_end))
+    return cursor, window_end, 0
+
+# Record how far the current sweep got; call inside the transaction that stores the page
+def save_sync_offset(conn, kind, offset):
+    conn.execute("UPDATE sync_state SET page_offset = ? WHERE kind = ?", (offset, kind))
+
+# Sweep finished: move the high-water mark up to the end of the window
+def finish_sync(conn, kind):
+    with conn:
+        conn.execute("""
+            UPDATE sync_state
+            SET cursor = window_end, window_end = NULL, page_offset = 0
+            WHERE kind = ?
+        """, (kind,))
+
+
+# ─── Failed events ──────────────────────────────────────────────────────────────
+
+# (id, api_call) of the kind's events to retry, those failed fewer than max_attempts times
+def failed_events(conn, kind, max_attempts):
+    return conn.execute("""
+        SELECT id, api_call FROM failed_events
+        WHERE kind = ? AND attempts < ?
+        ORDER BY failed_at
+    """, (kind, max_attempts)).fetchall()
+
+# After a page: forget the events that went through, count another attempt for the
+# (id, api_call) pairs that failed. Call inside the transaction that stores the page.
+def record_failures(conn, kind, done_ids, failed):
+    failed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    conn.executemany("DELETE FROM failed_events WHERE id = ?", [(ev_id,) for ev_id in done_ids])
+    conn.executemany("""
+        INSERT INTO failed_events (id, kind, api_call, attempts, failed_at)
+        VALUES (?, ?, ?, 1, ?)
+        ON CONFLICT(id) DO UPDATE SET attempts = attempts + 1, failed_at = excluded.failed_at
+    """, [(ev_id, kind, api_call, failed_at) for ev_id, api_call in failed])
+
+
+# ─── Hearings ───────────────────────────────────────────────────────────────────
+
+# Rows of (id, date, title, committee, url, date_inserted, API_call, status, content_hash,
+# fingerprint). OR IGNORE: another process may have stored an event since the caller checked.
+def insert_hearings(conn, rows):
+    conn.executemany("""
+        INSERT OR IGNORE INTO hearings
+            (id, date, title, committee, url, date_inserted, API_call, status, content_hash, fingerprint)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+# The subset of ids already stored in hearings, or merged into a stored hearing as an alias
+def existing_ids(conn, ids):
+    ids = list(ids)
+    found = set()
+    for start in range(0, len(ids), 250):  # stay under SQLite's bound-parameter limit
+        chunk = ids[start:start + 250]
+        marks = ",".join("?" * len(chunk))
+        found.update(row[0] for row in conn.execute(
+            f"SELECT id FROM hearings WHERE id IN ({marks}) "
+            f"UNION SELECT alias FROM aliases WHERE alias IN ({marks})", chunk + chunk))
+    return found
+
+
+# ─── Payload archive ────────────────────────────────────────────────────────────
+
+# Compressed body and content digest for a detail payload
+def pack(detail):
+    raw = json.dumps(detail, separators=(",", ":"), sort_keys=True).encode()
+    return zlib.compress(raw), hashlib.sha1(raw).hexdigest()
+
+def unpack(body):
+    return json.loads(zlib.decompress(body))
+
+# Archive (event_id, detail) pairs; a payload identical to the event's latest one is skipped.
+# Call inside the transaction that stores the rows built from them.
+def archive_payloads(conn, items):
+    fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    rows = []
+    for ev_id, detail in items:
+        if not detail:
+            continue
+        body, digest = pack(detail)
+        rows.append((ev_id, fetched_at, digest, body, ev_id, digest))
+    conn.executemany("""
+        INSERT OR IGNORE INTO payloads (event_id, fetched_at, digest, body)
+        SELECT ?, ?, ?, ?
+        WHERE (SELECT digest FROM payloads WHERE event_id = ? ORDER BY fetched_at DESC LIMIT 1)
+              IS NOT ?
+    """, rows)
+
+
+# ─── Change log ─────────────────────────────────────────────────────────────────
+
+# Record (hearing_id, field, old, new) changes; call inside the transaction that applies them
+def log_changes(conn, changes, changed_at):
+    conn.executemany("""
+        INSERT INTO changes (hearing_id, field, old, new, changed_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(*change, changed_at) for change in changes])
+
+# Changes recorded at or after since (ISO timestamp), joined with the hearing they belong to:
+# rows of (changed_at, hearing_id, field, old, new, date, committee, title, url)
+def changes_since(conn, since):
+    return conn.execute("""
+        SELECT c.changed_at, c.hearing_id, c.field, c.old, c.new,
+               h.date, h.committee, h.title, h.URL
+        FROM changes c
+        JOIN hearings h ON h.id = c.hearing_id
+        WHERE c.changed_at >= ?
+        ORDER BY c.changed_at, c.id
+    """, (since,)).fetchall()
+
+
+# ─── Digests ────────────────────────────────────────────────────────────────────
+
+# {date: {"channel_id", "ts", "rows_hash", "content_hash"}} for a digest's upcoming dates
+def get_digests(conn, kind, channel):
+    rows = conn.execute("""
+        SELECT date, channel_id, ts, rows_hash, content_hash
+        FROM digests
+        WHERE kind = ? AND channel = ? AND date >= date('now')
+    """, (kind, channel)).fetchall()
+    return {
+        date_str: {"channel_id": channel_id, "ts": json.loads(ts),
+                   "rows_hash": rows_hash, "content_hash": content_hash}
+        for date_str, channel_id, ts, rows_hash, content_hash in rows
+    }
+
+def save_digest(conn, kind, channel, date_str, channel_id, ts, rows_hash, content_hash):
+    with conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO digests
+                (kind, channel, date, channel_id, ts, rows_hash, content_hash, posted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (kind, channel, date_str, channel_id, json.dumps(ts), rows_hash, content_hash,
+              datetime.now(timezone.utc).isoformat(timespec="seconds")))
+        # Past dates' messages are never edited again
+        conn.execute("DELETE FROM digests WHERE date < date('now', '-7 days')")
+
+def delete_digest(conn, kind, channel, date_str):
+    with conn:
+        conn.execute("DELETE FROM digests WHERE kind = ? AND channel = ? AND date = ?",
+                     (kind, channel, date_str))
+
+
+# ─── Schedule runs ──────────────────────────────────────────────────────────────
+
+# {slot: ran_at} of the scheduler's last completed runs, ran_at an ISO UTC timestamp
+def last_runs(conn):
+    return dict(conn.execute("SELECT slot, ran_at FROM schedule_runs"))
+
+def record_run(conn, slot, ran_at):
+    with conn:
+        conn.execute("""
+            INSERT INTO schedule_runs (slot, ran_at) VALUES (?, ?)
+            ON CONFLICT(slot) DO UPDATE SET ran_at = excluded.ran_at
+        """, (slot, ran_at))
+
+
+# ─── Search ─────────────────────────────────────────────────────────────────────
+
+# Quote each word of free text as an FTS5 string, so punctuation ("H.R. 471",
+# "water-rights") is tokenized like the indexed text instead of parsed as syntax
+def fts_query(text):
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+# Hearings whose title or committee contain every word of query, best matches
+# first: rows of (date, committee, title, url)
+def search(conn, query, since=None, limit=50):
+    query = fts_query(query)
+    if not query:
+        return []
+    return conn.execute("""
+        SELECT h.date, h.committee, h.title, h.URL
+        FROM hearings_fts f
+        JOIN hearings h ON h.rowid = f.rowid
+        WHERE hearings_fts MATCH ?
+          AND (? IS NULL OR h.date >= ?)
+        ORDER BY f.rank
+        LIMIT ?
+    """, (query, since, since, limit)).fetchall()
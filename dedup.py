@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+from db import existing_ids
+from extract import get_cross_refs
+
+
+# "hearing" or "meeting", from an event's detail URL (.../hearing/... or
+# .../committee-meeting/...); None when unknown
+def endpoint(api_call):
+    if not api_call:
+        return None
+    return "meeting" if "/committee-meeting/" in api_call else "hearing"
+
+
+# The hearing and committee-meeting endpoints often list the same event under
+# different ids (a jacketNumber and an eventId). The first record stored is kept;
+# the other id becomes an alias of it and is skipped before any detail request.
+# Fingerprints only merge records from different endpoints: two meetings of one
+# committee with the same title on the same day are distinct events.
+class DedupIndex:
+    """Stored ids, aliases and fingerprints for one page of listed events."""
+
+    def __init__(self, conn, ids):
+        self.conn     = conn
+        self.seen     = existing_ids(conn, ids)  # stored or aliased: never fetched again
+        self.stored   = {}    # id -> (fingerprint, endpoint), for the events accepted from this page
+        self.pending  = {}    # alias -> (canonical_id, source), saved with the page
+        self.merged   = 0
+
+    def __contains__(self, ev_id):
+        return ev_id in self.seen
+
+    def add(self, ev_id):
+        self.seen.add(ev_id)
+
+    # The stored hearing this event duplicates, or None if it's new. A new event's
+    # cross-references are remembered so the other endpoint's record is never fetched.
+    def canonical(self, ev_id, api_call, hearing, detail):
+        refs = get_cross_refs(detail)
+        fingerprint, kind = hearing.fingerprint(), endpoint(api_call)
+
+        for ref in refs:
+            if canonical := self._resolve(ref):
+                return self._merge(ev_id, canonical, "cross_ref")
+        if other := self._same_event(ev_id, fingerprint, kind):
+            return self._merge(ev_id, other, "fingerprint")
+
+        self.stored[ev_id] = (fingerprint, kind)
+        for ref in refs:
+            self.pending.setdefault(ref, (ev_id, "cross_ref"))
+        return None
+
+    # A record from the other endpoint with the same fingerprint, on this page or stored
+    def _same_event(self, ev_id, fingerprint, kind):
+        if fingerprint is None or kind is None:
+            return None
+        for other, (other_fingerprint, other_kind) in self.stored.items():
+            if other_fingerprint == fingerprint and other_kind not in (kind, None):
+                return other
+        for other, api_call in self.conn.execute(
+                "SELECT id, API_call FROM hearings WHERE fingerprint = ? AND id != ?", (fingerprint, ev_id)):
+            if endpoint(api_call) not in (kind, None):
+                return other
+        return None
+
+    def _resolve(self, ref):
+        if ref in self.stored:
+            return ref
+        if ref in self.pending:
+            return self.pending[ref][0]
+        row = self.conn.execute("""
+            SELECT id FROM hearings WHERE id = ?
+            UNION ALL
+            SELECT canonical_id FROM aliases WHERE alias = ?
+            LIMIT 1
+        """, (ref, ref)).fetchone()
+        return row[0] if row else None
+
+    def _merge(self, ev_id, canonical, source):
+        print(f"Merging duplicate event {ev_id} into {canonical} ({source})")
+        self.pending[ev_id] = (canonical, source)
+        self.merged += 1
+        return canonical
+
+    # Store the aliases learnt from this page; call inside the transaction that stores it
+    def save(self):
+        created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.conn.executemany("""
+            INSERT OR IGNORE INTO aliases (alias, canonical_id, source, created_at)
+            VALUES (?, ?, ?, ?)
+        """, [(alias, canonical, source, created_at)
+              for alias, (canonical, source) in self.pending.items()])
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from slack_sdk.errors import SlackApiError
+import metrics
+
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+MAX_BLOCKS     = 50  # blocks per message
+MAX_LIST_ITEMS = 50  # elements per rich_text_list
+POST_RATE      = float(os.getenv("SLACK_POST_RATE", "1"))  # messages per second per channel
+POST_BURST     = 3
+MAX_ATTEMPTS   = 5
+
+
+# ─── Chunking ─────────────────────────────────────────────────────────────────
+
+# Split any rich_text_list longer than MAX_LIST_ITEMS into several rich_text blocks
+def split_lists(blocks):
+    out = []
+    for block in blocks:
+        lists = [e for e in block.get("elements", []) if e.get("type") == "rich_text_list"]
+        if block.get("type") != "rich_text" or len(lists) != 1 or len(lists[0]["elements"]) <= MAX_LIST_ITEMS:
+            out.append(block)
+            continue
+
+        items = lists[0]["elements"]
+        for start in range(0, len(items), MAX_LIST_ITEMS):
+            out.append({
+                **block,
+                "elements": [{**lists[0], "elements": items[start:start + MAX_LIST_ITEMS]}],
+            })
+    return out
+
+def _is_list(block):
+    return any(e.get("type") == "rich_text_list" for e in block.get("elements", []))
+
+# Turn a digest's blocks into one or more valid messages, keeping each date
+# header in the same message as the list that follows it
+def chunk_messages(blocks):
+    blocks = split_lists(blocks)
+    messages, start = [], 0
+    while start < len(blocks):
+        end = min(start + MAX_BLOCKS, len(blocks))
+        if end < len(blocks) and end - start > 1 and not _is_list(blocks[end - 1]):
+            end -= 1
+        messages.append(blocks[start:end])
+        start = end
+    return messages
+
+
+# ─── Rate limiting ────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    def __init__(self, rate=POST_RATE, capacity=POST_BURST):
+        self.rate     = rate
+        self.capacity = capacity
+        self.tokens   = capacity
+        self.updated  = time.monotonic()
+        self.lock     = threading.Lock()
+
+    # Block until a token is available, then spend it
+    def take(self):
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+    # Slack asked us to wait: drain the bucket so nothing goes out for `seconds`
+    def pause(self, seconds):
+        with self.lock:
+            self.tokens  = -seconds * self.rate
+            self.updated = time.monotonic()
+
+
+# ─── Delivery ─────────────────────────────────────────────────────────────────
+
+# Post a message, or edit the message at ts. Returns Slack's response, None on failure.
+def _post(client, bucket, channel, text, blocks, ts=None):
+    for attempt in range(MAX_ATTEMPTS):
+        bucket.take()
+        try:
+            metrics.count("slack_requests")
+            if ts:
+                return client.chat_update(channel=channel, ts=ts, text=text, blocks=blocks)
+            return client.chat_postMessage(channel=channel, text=text, blocks=blocks)
+        except SlackApiError as e:
+            if e.response.status_code != 429:
+                print(f"Error posting to {channel}: {e.response.get('error')}")
+                return None
+            delay = int(e.response.headers.get("Retry-After", 1))
+            metrics.count("slack_rate_limited")
+            print(f"Rate limited by Slack on {channel}, retrying in {delay}s")
+            bucket.pause(delay)
+    print(f"Giving up on message to {channel} after {MAX_ATTEMPTS} attempts")
+    return None
+
+# Post (channel, text, blocks) messages, splitting oversized ones.
+# Returns (delivered, failed) message counts.
+def deliver(client, messages):
+    buckets = {}
+    delivered = failed = 0
+
+    with metrics.stage("slack_post"):
+        for channel, text, blocks in messages:
+            bucket = buckets.setdefault(channel, TokenBucket())
+            parts  = chunk_messages(blocks)
+            for n, part in enumerate(parts, 1):
+                part_text = f"{text} ({n}/{len(parts)})" if len(parts) > 1 else text
+                if _post(client, bucket, channel, part_text, part) is not None:
+                    delivered += 1
+                else:
+                    failed += 1
+
+    metrics.count("slack_delivered", delivered)
+    metrics.count("slack_failed", failed)
+
+    print(f"Slack delivery: {delivered} delivered, {failed} failed")
+    return delivered, failed
+
+
+# ─── Edit-in-place digests ────────────────────────────────────────────────────
+
+# Keep one message per date in channel for the digest `kind`, from rows of
+# (date, committee, title, url). Dates whose hearings match what was last posted
+# are skipped without rendering; changed ones are re-rendered and edited in place
+# with chat.update; new ones are posted and remembered (db digests table). A date
+# whose hearings are all gone has its messages deleted.
+# Returns (posted, edited, unchanged) date counts.
+def publish_digest(client, kind, channel, text, rows):
+    from db import get_conn, get_digests, save_digest, delete_digest
+    from post import format_date, group_by_date, render_date
+
+    conn    = get_conn()
+    bucket  = TokenBucket()
+    stored  = get_digests(conn, kind, channel)
+    by_date = group_by_date(rows)
+    posted = edited = unchanged = removed = failed = 0
+
+    with metrics.stage("slack_post"):
+        for date_str, entries in sorted(by_date.items()):
+            rows_hash = _hash(entries)
+            previous  = stored.get(date_str)
+            if previous and previous["rows_hash"] == rows_hash:
+                unchanged += 1
+                continue
+
+            parts = chunk_messages(render_date(date_str, entries))
+            blocks_hash = _hash(parts)
+            if previous and previous["content_hash"] == blocks_hash:
+                save_digest(conn, kind, channel, date_str, previous["channel_id"], previous["ts"],
+                            rows_hash, blocks_hash)
+                unchanged += 1
+                continue
+
+            date_text = f"{text} {format_date(date_str)}"
+            old_ts    = previous["ts"] if previous else []
+            target    = previous["channel_id"] if previous else channel
+            ts = []
+            for n, part in enumerate(parts):
+                response = None
+                if n < len(old_ts):
+                    response = _post(client, bucket, target, date_text, part, ts=old_ts[n])
+                    if response is None:
+                        print(f"Posting {date_str} part {n + 1} again in {channel}")
+                if response is None:  # new part, or its message can't be edited (deleted, too old)
+                    response = _post(client, bucket, target, date_text, part)
+                if response is None:
+                    break
+                target = response["channel"]  # chat.update needs the channel ID, not its name
+                ts.append(response["ts"])
+            else:
+                _delete(client, target, [t for t in old_ts if t not in ts])
+                save_digest(conn, kind, channel, date_str, target, ts, rows_hash, blocks_hash)
+                if previous:
+                    edited += 1
+                else:
+                    posted += 1
+                continue
+            failed += 1
+
+        # Dates that no longer have any hearings (all rescheduled or removed)
+        for date_str in sorted(set(stored) - set(by_date)):
+            _delete(client, stored[date_str]["channel_id"], stored[date_str]["ts"])
+            delete_digest(conn, kind, channel, date_str)
+            removed += 1
+
+    metrics.count("digest_posted", posted)
+    metrics.count("digest_edited", edited)
+    metrics.count("digest_unchanged", unchanged)
+    metrics.count("digest_removed", removed)
+    metrics.count("slack_failed", failed)
+    print(f"{kind} digest in {channel}: {posted} posted, {edited} edited, "
+          f"{unchanged} unchanged, {removed} removed, {failed} failed")
+    return posted, edited, unchanged
+
+def _delete(client, channel, ts_list):
+    for ts in ts_list:
+        try:
+            client.chat_delete(channel=channel, ts=ts)
+        except SlackApiError as e:
+            print(f"Error deleting {ts} in {channel}: {e.response.get('error')}")
+
+def _hash(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
@@ -2,12 +2,10 @@ irrelevant_hearings = ["House Natural Resources",
                            "House Natural Resources Subcommittee on Water, Wildlife and Fisheries", 
                            "House Natural Resources Subcommittee on Energy and Mineral Resources", 
                            "House Natural Resources Subcommittee on Federal Lands",
-                           "House Natural Resources Subcommittee on Water, Wildlife and Fisheries",
                            "House Indian and Insular Affairs",
                            "House Public Lands Committee",
                             "House Agriculture",
                            "House Agriculture Subcommittee on General Farm Commodities, Risk Management, and Credit",
-                           "House Natural Resources Subcommittee on Water, Wildlife and Fisheries", 
                             "Senate Indian Affairs (Select) Committee", 
                             "Senate Agriculture Committee", 
                             "Senate Agriculture, Nutrition, and Forestry",
@@ -25,4 +23,7 @@ irrelevant_hearings = ["House Natural Resources",
                            "Senate Environment and Public Works Subcommittee on Fisheries, Water, and Wildlife", 
                            "Senate Environment and Public Works Subcommittee on Clean Air, Climate, and Nuclear Innovation and Safety",
                            "Senate Environment and Public Works Subcommittee on Chemical Safety, Waste Management, Environmental Justice, and Regulatory Oversight",
-                           "Senate Environment and Public Works Subcommittee on Transportation and Infrastructure"]
\ No newline at end of file
+                           "Senate Environment and Public Works Subcommittee on Transportation and Infrastructure"]
+
+# Committees whose names start with any of these are excluded as well
+irrelevant_prefixes = []
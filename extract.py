@@ -1,4 +1,7 @@
-from datetime import datetime
+import hashlib
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
 
 # ─── Detail Extractors ───────────────────────────────────────────────────────────
 
@@ -18,21 +21,128 @@ def get_committee(detail: dict) -> str:
     return committees[0].get("name", "") if committees else ""
 
 def get_URL(detail: dict) -> str: 
-    if detail.get("meetingDocuments"):
-        meetingDocuments = detail.get("meetingDocuments", [])
-        return meetingDocuments[0].get("url", "") if meetingDocuments else ""
-    if detail.get("formats"):
-        meetingDocuments = detail.get("formats", [])
-        return meetingDocuments[1].get("url", "") if meetingDocuments else ""
+    if meetingDocuments := detail.get("meetingDocuments"):
+        return meetingDocuments[0].get("url", "")
+    if formats := detail.get("formats"):
+        # The second format is the formatted text; hearings with one format only have a PDF
+        return formats[1 if len(formats) > 1 else 0].get("url", "")
     return 
 
 def get_status(detail: dict) -> str:
     return detail.get("meetingStatus", "Unknown") or detail.get("status", "Unknown")
 
+# Ids the same event has on the other endpoint: a hearing's associatedMeeting and
+# a committee meeting's hearingTranscript entries
+def get_cross_refs(detail: dict) -> list:
+    refs = []
+    if (meeting := detail.get("associatedMeeting")) and meeting.get("eventId"):
+        refs.append(str(meeting["eventId"]))
+    for transcript in detail.get("hearingTranscript") or ():
+        if transcript.get("jacketNumber"):
+            refs.append(str(transcript["jacketNumber"]))
+    return refs
+
+
+# ─── Dates ───────────────────────────────────────────────────────────────────────
+
+# API dates are "YYYY-MM-DD" or "YYYY-MM-DDTHH:MM:SSZ"; the same few values repeat
+# across a run, so parses are cached. Returns a naive datetime (UTC for timestamps).
 def parse_date(s):
-    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d"):
-        try:
-            return datetime.strptime(s, fmt)
-        except:
-            continue
-    raise ValueError(f"Unrecognized date format: {s!r}")
\ No newline at end of file
+    if not isinstance(s, str):
+        raise ValueError(f"Unrecognized date format: {s!r}")
+    return _parse_date(s)
+
+@lru_cache(maxsize=4096)
+def _parse_date(s):
+    try:
+        # Fast path for the two shapes the API sends, picked by length
+        if len(s) == 20 and s[19] == "Z":
+            return datetime.fromisoformat(s[:19])
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        raise ValueError(f"Unrecognized date format: {s!r}") from None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+# The "YYYY-MM-DD" stored in the hearings table for an API date
+@lru_cache(maxsize=4096)
+def _parse_day(s):
+    return _parse_date(s).date().isoformat()
+
+
+# ─── Normalized record ───────────────────────────────────────────────────────────
+
+class Hearing:
+    """One hearing or committee meeting, as stored in the hearings table."""
+    __slots__ = ("date", "title", "committee", "url", "status")
+
+    def __init__(self, date, title, committee, url, status):
+        self.date      = date       # "YYYY-MM-DD"
+        self.title     = title
+        self.committee = committee
+        self.url       = url
+        self.status    = status
+
+    def __repr__(self):
+        return f"Hearing({self.date}, {self.committee!r}, {self.title!r}, {self.status})"
+
+    def __eq__(self, other):
+        return isinstance(other, Hearing) and self.fields() == other.fields()
+
+    def fields(self):
+        return (self.date, self.title, self.committee, self.url, self.status)
+
+    # Hash of the fields, kept in hearings.content_hash so a refresh can tell
+    # an unchanged payload apart without comparing column by column
+    def digest(self):
+        return content_hash(self.fields())
+
+    # Same value for the hearing and committee-meeting records of one event, which
+    # differ in id, title case and punctuation ("LEGISLATIVE HEARING ON H.R. 471" /
+    # "Legislative Hearing on H.R. 471"). None without a title or committee: too
+    # little to tell two events apart.
+    def fingerprint(self):
+        committee, title = _loose(self.committee), _loose(self.title)
+        if not committee or not title:
+            return None
+        return content_hash((self.date, committee, title))
+
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def _loose(text):
+    return _NON_ALNUM.sub(" ", (text or "").casefold()).strip()
+
+# A missing value hashes like an empty one: older rows store NULL where extraction gives ""
+def content_hash(fields):
+    return hashlib.sha1("\x1f".join(f or "" for f in fields).encode()).hexdigest()
+
+
+# Turn a hearing or committeeMeeting detail payload into a Hearing in one pass.
+# Same results as the get_* accessors above; raises ValueError for a missing or bad date.
+def normalize(detail: dict) -> Hearing:
+    get = detail.get
+
+    date_obj = get("date")
+    if not date_obj and (dates := get("dates")):
+        date_obj = dates[0].get("date")
+
+    committee = get("committeeName", "")
+    if not committee and (committees := get("committees")):
+        committee = committees[0].get("name", "")
+
+    if documents := get("meetingDocuments"):
+        url = documents[0].get("url", "")
+    elif formats := get("formats"):
+        url = formats[1 if len(formats) > 1 else 0].get("url", "")
+    else:
+        url = None
+
+    return Hearing(
+        _parse_day(date_obj) if isinstance(date_obj, str) else parse_date(date_obj),
+        get("title", ""),
+        committee,
+        url,
+        get("meetingStatus", "Unknown") or get("status", "Unknown"),
+    )
@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import db
+
+
+FEED_CACHE_SIZE = 256  # filtered variants kept per snapshot
+
+CANCELLED = {"Cancelled", "Canceled", "Postponed"}
+
+
+# ─── Rendering ──────────────────────────────────────────────────────────────────
+
+def render_json(rows, generated):
+    return json.dumps({
+        "generated": generated,
+        "hearings": [
+            {"id": ev_id, "date": date_str, "committee": committee, "title": title,
+             "url": url, "status": status}
+            for ev_id, date_str, committee, title, url, status in rows
+        ],
+    }, separators=(",", ":")).encode()
+
+# RFC 5545 text: escape \ ; , and newlines, fold lines at 75 octets
+def _ics_text(value):
+    return (value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _fold(line):
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line
+    parts, start = [], 0
+    while start < len(raw):
+        end = min(start + (75 if not parts else 74), len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:  # don't split a UTF-8 character
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start = end
+    return "\r\n ".join(parts)
+
+# All-day events: the hearings table only knows the date
+def render_ics(rows, generated):
+    stamp = generated.replace("-", "").replace(":", "").replace("+0000", "Z")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//hearing-bot//hearings//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Congressional hearings",
+    ]
+    for ev_id, date_str, committee, title, url, status in rows:
+        day = date.fromisoformat(date_str)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{ev_id}@hearing-bot",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_ics_text(f'{committee}: {title}' if committee else title)}",
+            f"STATUS:{'CANCELLED' if status in CANCELLED else 'CONFIRMED'}",
+        ]
+        if url:
+            lines.append(f"URL:{url}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
+
+RENDERERS = {
+    "json": (render_json, "application/json"),
+    "ics":  (render_ics, "text/calendar; charset=utf-8"),
+}
+
+
+# ─── Precomputed feeds ──────────────────────────────────────────────────────────
+
+class Body:
+    """One response body with its gzip copy and strong ETags for each."""
+    __slots__ = ("raw", "gzipped", "etag", "gzip_etag", "content_type")
+
+    def __init__(self, raw, content_type):
+        self.raw          = raw
+        self.gzipped      = gzip.compress(raw, compresslevel=6, mtime=0)
+        self.etag         = f'"{hashlib.sha1(raw).hexdigest()[:24]}"'
+        self.gzip_etag    = self.etag[:-1] + '-gz"'  # a different representation needs its own ETag
+        self.content_type = content_type
+
+
+# The upcoming hearings as JSON and iCalendar bodies. The unfiltered feeds are rebuilt
+# whenever the upcoming view changes (or the day rolls over); filtered ones are built
+# on first request and kept until the next rebuild.
+class Feeds:
+    def __init__(self, path=None):
+        self.conn       = sqlite3.connect(path or db.DATABASE_PATH, check_same_thread=False)
+        self.rows       = ()
+        self.built_on   = None
+        self.generated  = None
+        self.bodies     = {}   # (format, committee, start, end) -> Body
+        self._lock      = threading.Lock()
+        self._load_lock = threading.Lock()  # conn is shared by the view's poll thread and requests
+
+    def rebuild(self, view=None):
+        with self._load_lock:
+            self._load()
+        for fmt in RENDERERS:
+            self.get(fmt)
+
+    def _load(self):
+        today = date.today()
+        rows = tuple(self.conn.execute("""
+            SELECT id, date, committee, title, URL, status
+            FROM hearings
+            WHERE date >= ?
+            ORDER BY date, committee, title
+        """, (today.isoformat(),)))
+        with self._lock:
+            self.rows, self.built_on = rows, today
+            self.generated = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+0000")
+            self.bodies = {}
+
+    def get(self, fmt, committee="", start="", end=""):
+        if self.built_on != date.today():
+            with self._load_lock:  # first request of the day: one thread reloads, the others wait
+                if self.built_on != date.today():
+                    self._load()
+        key = (fmt, committee.casefold(), start, end)
+        with self._lock:
+            body = self.bodies.get(key)
+            rows, generated = self.rows, self.generated
+        if body is not None:
+            return body
+
+        if committee:
+            rows = [row for row in rows if key[1] in (row[2] or "").casefold()]
+        if start:
+            rows = [row for row in rows if row[1] >= start]
+        if end:
+            rows = [row for row in rows if row[1] <= end]
+        render, content_type = RENDERERS[fmt]
+        body = Body(render(rows, generated), content_type)
+
+        with self._lock:
+            if len(self.bodies) >= FEED_CACHE_SIZE:
+                self.bodies.clear()
+            self.bodies[key] = body
+        return body
+
+
+# Add GET /hearings.json and /hearings.ics (?committee=judiciary&from=YYYY-MM-DD&to=YYYY-MM-DD)
+def register(app, view):
+    from flask import Response, abort, request
+
+    feeds = Feeds()
+    feeds.rebuild()
+    view.listeners.append(feeds.rebuild)
+
+    def serve_feed(fmt):
+        args  = request.args
+        start, end = args.get("from", ""), args.get("to", "")
+        for value in (start, end):
+            if value:
+                try:
+                    date.fromisoformat(value)
+                except ValueError:
+                    abort(400)
+        body = feeds.get(fmt, args.get("committee", ""), start, end)
+
+        gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+        etag    = body.gzip_etag if gzipped else body.etag
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "public, max-age=300"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=304, headers=headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        return Response(body.gzipped if gzipped else body.raw, content_type=body.content_type,
+                        headers=headers)
+
+    app.add_url_rule("/hearings.json", "hearings_json", lambda: serve_feed("json"))
+    app.add_url_rule("/hearings.ics", "hearings_ics", lambda: serve_feed("ics"))
+    return app
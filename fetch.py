@@ -1,21 +1,31 @@
+import json
 import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from dotenv import load_dotenv
 import os 
-import sqlite3
 from pathlib import Path
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
-from extract import get_URL
+import cache
+import metrics
+import quota
 
 
 # ─── Configuration ────────────────────────────────────────────────────────────
 
 CONGRESS = 119 # Update this for the current Congress session
-HEARING_URL   = f"https://api.congress.gov/v3/hearing/{CONGRESS}"
-MEETING_URL   = f"https://api.congress.gov/v3/committee-meeting/{CONGRESS}"
+API_BASE      = os.getenv("CONGRESS_API_BASE", "https://api.congress.gov/v3")  # bench/server.py for local runs
+LISTING_KEYS  = {"hearing": "hearings", "meeting": "committeeMeetings"}
 today = date.today().isoformat()  # e.g. "2025-06-18"
 
+PAGE_SIZE = 250  # maximum page size the listing endpoints accept
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))  # concurrent detail requests
+RATE_LIMIT_RETRIES = 5   # attempts per request after a 429
+RATE_LIMIT_BACKOFF = 2.0  # seconds, doubled per attempt when no Retry-After
+
 # Environment variables and session setup
 env_path = Path('.') / '.env'
 load_dotenv(dotenv_path=env_path)
@@ -25,55 +35,140 @@ HEADERS = {"X-Api-Key": API_KEY}
 
 session = requests.Session()
 session.headers.update({"X-Api-Key": API_KEY})
+# 429s are handled by _get() so that every worker backs off together
 retry = Retry(
     total=3,
     backoff_factor=0.5,
-    status_forcelist=[429, 502, 503, 504],
+    status_forcelist=[502, 503, 504],
     allowed_methods=["GET"],
+    respect_retry_after_header=False,  # otherwise urllib3 retries 429s itself
 )
 
-session.headers.update({"X-Api-Key": API_KEY})
-session.mount("https://", HTTPAdapter(max_retries=retry))
+adapter = HTTPAdapter(max_retries=retry, pool_maxsize=FETCH_WORKERS)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+# ─── Rate limiting ──────────────────────────────────────────────────────────────
+
+_backoff_lock  = threading.Lock()
+_backoff_until = 0.0
+
+# Pause all workers until the API's Retry-After (or our own backoff) has passed
+def _rate_limited(r, attempt):
+    global _backoff_until
+    retry_after = r.headers.get("Retry-After", "")
+    delay = float(retry_after) if retry_after.isdigit() else RATE_LIMIT_BACKOFF * 2 ** attempt
+    with _backoff_lock:
+        _backoff_until = max(_backoff_until, time.monotonic() + delay)
+    metrics.count("api_rate_limited")
+    print(f"Rate limited by API, backing off {delay:.0f}s")
+
+def _get(url, **kwargs):
+    for attempt in range(RATE_LIMIT_RETRIES):
+        wait = _backoff_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        if attempt:
+            metrics.count("api_retries")
+        quota.acquire()  # shared hourly budget, across threads and processes
+        r = session.get(url, timeout=10, **kwargs)
+        metrics.count("api_requests")
+        retries = getattr(r.raw, "retries", None)
+        if retries and retries.history:
+            metrics.count("api_retries", len(retries.history))
+        if r.status_code != 429:
+            return r
+        _rate_limited(r, attempt)
+    return r
 
 # ─── Main fetches ───────────────────────────────────────────────────────────────
 
-# Fetch all hearings or committee meetings for the current Congress
-def fetch_all(kind):
+# Listing endpoint for one kind ("hearing" / "meeting") and Congress
+def listing_url(kind, congress=CONGRESS):
+    return f"{API_BASE}/{'hearing' if kind == 'hearing' else 'committee-meeting'}/{congress}"
+
+# One listing page, returns (events, has_next, total count).
+# status=None lists every event, not just scheduled ones.
+def fetch_page(kind, offset, congress=CONGRESS, status="Scheduled", since=None, until=None):
+    params = {"limit": PAGE_SIZE, "offset": offset}
+    if status:
+        params["meetingStatus"] = status
+    if since:
+        params["fromDateTime"] = since
+    if until:
+        params["toDateTime"] = until
+
+    with metrics.stage("list_fetch"):
+        r = _get(listing_url(kind, congress), params=params)
+        r.raise_for_status()
+        payload = r.json()
+    pagination = payload.get("pagination", {})
+    return payload.get(LISTING_KEYS[kind], []), bool(pagination.get("next")), pagination.get("count")
 
-    try:
-        url = HEARING_URL if kind == "hearing" else MEETING_URL
+# Walk the listing for one kind page by page, yielding (next_offset, events).
+# since/until bound the events' updateDate ("YYYY-MM-DDTHH:MM:SSZ").
+def fetch_pages(kind, since=None, until=None, offset=0):
+    while True:
+        events, has_next, _ = fetch_page(kind, offset, since=since, until=until)
+        offset += len(events)
+        yield offset, events
 
-        params = {
-        "meetingStatus": "Scheduled",
-        "limit": 250
-        }
+        if not events or not has_next:
+            return
 
-        r = session.get(url, params=params, timeout=10)
-        r.raise_for_status() 
-        key = "hearings" if kind == "hearing" else "committeeMeetings"
-        return r.json().get(key, [])
+
+# Stream all scheduled hearings or committee meetings for the current Congress
+def fetch_all(kind):
+
+    try:
+        for _, page in fetch_pages(kind):
+            yield from page
 
     except Exception as e:
         print(f"Error fetching {kind}s: {e}")
-        return []
     
 
-# Fetch detailed information about a specific hearing or committee meeting
+# Fetch detailed information about a specific hearing or committee meeting.
+# Responses are cached on disk; stale entries are revalidated with ETag/Last-Modified.
+# Returns None when the request failed, so callers can retry the event later.
 def fetch_event_detail(url):
      
     try:
-        r = requests.get(
-            url,
-            headers=HEADERS,
-            timeout=10
-        )
+        cached = cache.lookup(url)
+        if cached and cached[3]:
+            return _unwrap(json.loads(cached[0]))
+
+        headers = {}
+        if cached and cached[1]:
+            headers["If-None-Match"] = cached[1]
+        if cached and cached[2]:
+            headers["If-Modified-Since"] = cached[2]
+
+        start = time.perf_counter()
+        r = _get(url, headers=headers)
+        metrics.observe("detail_fetch", time.perf_counter() - start)
+        if r.status_code == 304 and cached:
+            cache.revalidated(url)
+            return _unwrap(json.loads(cached[0]))
 
-        r = session.get(url, headers=HEADERS, timeout=10) 
         r.raise_for_status()
         payload = r.json()
-        return payload.get("hearing") or payload.get("committeeMeeting") or {}
+        cache.store(url, r.text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return _unwrap(payload)
 
 
     except Exception as e:
-        print(f"Error fetching event detail: {e}")
-        return {}
+        print(f"Error fetching event detail {url}: {e}")
+        return None
+
+def _unwrap(payload):
+    return payload.get("hearing") or payload.get("committeeMeeting") or {}
+
+
+# Fetch details for many events concurrently, results in the same order as urls
+def fetch_details(urls, workers=FETCH_WORKERS):
+    with metrics.stage("detail_fetch"):
+        if workers <= 1:
+            return [fetch_event_detail(url) for url in urls]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fetch_event_detail, urls))
@@ -1,112 +1,238 @@
-import sqlite3
-from slack_sdk import WebClient
-from post import post_upcoming, post_last_update, post_slack, post_changed
-from backfill import backfill_missing_urls, check_status
 from pathlib import Path
-from dotenv import load_dotenv
-from flask import Flask 
-from slackeventsapi import SlackEventAdapter
 import os
 import sys
-from update import update
-from excluded import irrelevant_hearings 
-
-
-# ─── Setup SQLite ─────────────────────────────────────
-
-conn = sqlite3.connect("hearings.db")
-c    = conn.cursor() 
-c.execute("""
-CREATE TABLE IF NOT EXISTS hearings (
-    id        TEXT PRIMARY KEY,
-    date      TEXT,
-    title     TEXT,
-    committee TEXT,
-    URL       TEXT,      
-    API_call  TEXT,
-    date_inserted TEXT,
-    status    TEXT
-)
-""")
-conn.commit()
-
-# Set up Slack app
-env_path = Path('.') / '.env'
-load_dotenv(dotenv_path=env_path)
-app = Flask(__name__)
-slack_event_adapter = SlackEventAdapter(os.environ['SIGNING_SECRET'],'/slack/events',app) 
-client = WebClient(token=os.environ['SLACK_TOKEN']) 
+
+
+# Modules each subcommand needs. They are imported inside the command so that a
+# cron run only pays for its own stack (bench/startup.py checks these budgets).
+COMMAND_IMPORTS = {
+    "check_status": ("backfill",),
+    "backfill":     ("backfill",),
+    "update":       ("update", "deliver"),
+    "upcoming":     ("post", "deliver"),
+    "last_update":  ("post", "deliver"),
+    "reextract":    ("reextract",),
+    "search":       ("db",),
+    "crawl":        ("crawl", "deliver"),
+}
+
+
+# ─── Slack app ─────────────────────────────────────────────────────────────────
+
+# Set up Slack client
+def get_client():
+    from slack_sdk import WebClient
+    return WebClient(
+        token=os.environ['SLACK_TOKEN'],
+        base_url=os.getenv("SLACK_API_URL", WebClient.BASE_URL),  # bench/server.py for local runs
+    )
+
+# Set up Slack app (Flask + events adapter), only needed when serving
+def create_app():
+    from flask import Flask
+    from slackeventsapi import SlackEventAdapter
+
+    app = Flask(__name__)
+    app.slack_event_adapter = SlackEventAdapter(os.environ['SIGNING_SECRET'], '/slack/events', app)
+    return app
+
+
+# ─── Commands ──────────────────────────────────────────────────────────────────
+
+# "hearing_bot.py check_status" command checks for schedule changes
+def run_check_status():
+    from backfill import check_status
+    check_status()
+
+# "hearing_bot.py backfill" command fills in missing URLs for upcoming hearings
+def run_backfill():
+    from backfill import backfill_missing_urls
+    backfill_missing_urls()
+
+# "hearing_bot.py update" command will run the update function
+def run_update():
+    from update import update
+
+    print("Ran update function")
+    daily_messages, alerts = update()
+
+    if not daily_messages and not alerts:
+        print("No new hearings found.")
+        return
+    deliver_new_hearings(daily_messages, alerts)
+
+# Post new upcoming hearings (post_slack() blocks per date) and keyword alerts
+def deliver_new_hearings(daily_messages, alerts):
+    from deliver import deliver
+
+    deliver(get_client(), [
+        ("#hearings", f"New upcoming hearings on {date_str}", blocks)
+        for date_str, blocks in daily_messages.items()
+    ] + [
+        # Keyword subscriptions (alerts.py), one digest per subscribed channel
+        (channel, "New hearings matching your keywords", digest(daily_blocks))
+        for channel, daily_blocks in alerts.items()
+    ])
+
+# "hearing_bot.py upcoming" command will post all upcoming hearings, one message per
+# date; a re-run edits the dates whose hearings changed and skips the others
+def run_upcoming():
+    from post import post_upcoming
+    from deliver import publish_digest
+
+    upcoming = post_upcoming()
+
+    if upcoming:
+        publish_digest(get_client(), "upcoming", "#private-test-channel", "Upcoming hearings on", upcoming)
+
+# "hearing_bot.py last_update" command will post the last posted hearings
+def run_last_update():
+    from post import post_last_update
+    from deliver import publish_digest
+
+    last_update = post_last_update()
+
+    # One digest per batch (date_inserted): a later batch gets its own messages
+    # instead of overwriting the previous batch's
+    if last_update:
+        batch, rows = last_update
+        publish_digest(get_client(), f"last_update:{batch}", "#private-test-channel",
+                       "Last posted hearings on", rows)
+
+# "hearing_bot.py crawl <congress> [congress ...]" harvests every event of those
+# Congresses; upcoming hearings it stores are announced like update's
+def run_crawl():
+    from crawl import crawl
+
+    if len(sys.argv) < 3:
+        print("Usage: hearing_bot.py crawl <congress> [congress ...]")
+        return
+    daily_messages, alerts = crawl([int(c) for c in sys.argv[2:]])
+    if daily_messages or alerts:
+        deliver_new_hearings(daily_messages, alerts)
+
+# "hearing_bot.py search <query>" full-text searches stored hearings (SQLite FTS5 syntax)
+def run_search():
+    from db import get_conn, search
+
+    query = " ".join(sys.argv[2:])
+    if not query:
+        print('Usage: hearing_bot.py search "water rights"')
+        return
+    for date_str, committee, title, url in search(get_conn(), query):
+        print(f"{date_str} | {committee} | {title} | {url or ''}")
+
+# "hearing_bot.py reextract" rebuilds hearings columns from archived payloads (no API calls)
+def run_reextract():
+    from reextract import reextract
+    reextract()
+
+# Flatten post_slack()'s per-date blocks into one digest, in date order
+def digest(daily_blocks):
+    return [block for date_str in sorted(daily_blocks) for block in daily_blocks[date_str]]
+
+COMMANDS = {
+    "check_status": run_check_status,
+    "backfill":     run_backfill,
+    "update":       run_update,
+    "upcoming":     run_upcoming,
+    "last_update":  run_last_update,
+    "reextract":    run_reextract,
+    "search":       run_search,
+    "crawl":        run_crawl,
+}
 
 
 # ─── Main ──────────────────────────────────────────────────────────────────────
 
+# Run one command and write its metrics. A lock file per command under the data
+# directory keeps a cron run and the serve scheduler from running it twice at once.
+def run(name, profile=False):
+    from db import DATABASE_PATH, get_conn
+    import cache
+    import fcntl
+    import metrics
+    import quota
+
+    data_dir = Path(DATABASE_PATH).parent
+    with open(data_dir / f".{name}.lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"{name} is already running, skipping")
+            return
+
+        # Create database if it doesn't exist
+        conn = get_conn()
+        metrics.reset()
+        quota.priority = quota.COMMAND_PRIORITIES.get(name, "ingest")
+        cache_before   = dict(cache.stats)
+        written_before = conn.rows_written
+
+        if profile:
+            import profiling
+            with profiling.profiled(name, os.getenv("PROFILE_DIR", data_dir / "profiles")):
+                COMMANDS[name]()
+        else:
+            COMMANDS[name]()
+        writes = conn.rows_written - written_before
+        print(f"Detail cache: {cache.summary()}")
+        print(f"DB rows written: {writes}")
+        print(f"API quota left: {quota.remaining():.0f}/{quota.API_QUOTA}")
+
+    # Structured run summary + Prometheus textfile under the data volume
+    for stat, n in cache.stats.items():
+        metrics.count(f"cache_{stat}", n - cache_before.get(stat, 0))
+    metrics.count("db_rows_written", writes)
+    metrics.count("api_quota_remaining", int(quota.remaining()))
+    report = metrics.write(name, os.getenv("METRICS_DIR", data_dir / "metrics"))
+    print("Stages: " + ", ".join(f"{stage} {s:.2f}s" for stage, s in report["stages"].items()))
+
+# "hearing_bot.py serve" keeps one process up: the Slack events endpoint, the
+# /hearings slash command, the JSON/iCalendar feeds and the cron schedule
+# (scheduler.SCHEDULE), reusing the HTTP session, DB connection and caches
+def serve(profile=False):
+    from functools import partial
+    from waitress import serve as serve_wsgi
+    import feeds
+    import scheduler
+    import slash
+
+    app  = create_app()
+    view = slash.UpcomingView()
+    slash.register(app, view)
+    feeds.register(app, view)
+    view.start()
+    scheduler.start(partial(run, profile=profile))
+    serve_wsgi(app, host="0.0.0.0", port=int(os.getenv("PORT", "8080")),
+               threads=int(os.getenv("WEB_THREADS", "8")))
+
+# "hearing_bot.py <command> --profile" also writes a cProfile dump and a tracemalloc
+# snapshot to <data volume>/profiles (see profiling.py); with serve, every
+# scheduled run is profiled
 def main():
+    profile = "--profile" in sys.argv
+    if profile:
+        sys.argv.remove("--profile")
+    name = sys.argv[1] if len(sys.argv) > 1 else None
+    if name not in COMMANDS and name != "serve":
+        print("No command found")
+        return
+
+    from db import DATABASE_PATH
+
     # For server, check if the database path is set and the directory exists
-    DB_PATH = os.getenv("DATABASE_PATH", "/app/data/hearings.db")
-    if not Path("/app/data").is_dir():
+    data_dir = Path(DATABASE_PATH).parent
+    if not data_dir.is_dir():
         raise RuntimeError(
-            "/app/data volume is not mounted – aborting."
-        )
-    
-    # Create database if it doesn't exist
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False) 
-    with conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS hearings (
-                id        TEXT PRIMARY KEY,
-                date      TEXT,
-                title     TEXT,
-                committee TEXT,
-                URL       TEXT,      
-                API_call  TEXT,
-                date_inserted TEXT,
-                status    TEXT
-            )
-            """) 
-    # "hearing_bot.py check_status" command checks for schedule changes
-    if len(sys.argv) > 1 and sys.argv[1] == "check_status":
-        check_status()
-
-    # "hearing_bot.py update" command will run the update function
-    elif len(sys.argv) > 1 and sys.argv[1] == "update":    
-        print("Ran update function")
-        daily_messages = update(DB_PATH) 
-
-        if not daily_messages:
-            print("No new hearings found.")           
-            return
-        for date_str, blocks in daily_messages.items():
-            client.chat_postMessage(
-                channel = "#hearings",
-                text = f"New upcoming hearings on {date_str}",
-                blocks=blocks
-            )
-
-    # "hearing_bot.py upcoming" command will post all upcoming hearings
-    elif len(sys.argv) > 1 and sys.argv[1] == "upcoming":
-        upcoming = post_upcoming()
-
-        if upcoming:
-            client.chat_postMessage(
-                channel = "#private-test-channel",
-                text = "New upcoming hearings:",
-                blocks=upcoming
-            )
-
-    # "hearing_bot.py last_update" command will post the last posted hearings
-    elif len(sys.argv) > 1 and sys.argv[1] == "last_update":
-        last_update = post_last_update()
-
-        if last_update:
-            client.chat_postMessage(
-            channel = "#private-test-channel",
-            text = "Last posted hearings:",
-            blocks=last_update
+            f"{data_dir} volume is not mounted – aborting."
         )
-            
+
+    if name == "serve":
+        serve(profile)
     else:
-        print("No command found")
+        run(name, profile)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+# ─── Collection ───────────────────────────────────────────────────────────────
+
+# Per-run instrumentation. Stages accumulate wall time, counters are plain
+# integers, and latency samples are kept so p50/p95 can be reported at the end.
+_lock     = threading.Lock()
+stages    = {}   # stage -> seconds
+counters  = {}   # name  -> count
+latencies = {}   # name  -> [seconds, ...]
+started   = time.time()
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start)
+
+def add_time(name, seconds):
+    with _lock:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+def count(name, n=1):
+    with _lock:
+        counters[name] = counters.get(name, 0) + n
+
+def observe(name, seconds):
+    with _lock:
+        latencies.setdefault(name, []).append(seconds)
+
+# Start a fresh run (serve reports each scheduled command separately)
+def reset():
+    global started
+    with _lock:
+        stages.clear()
+        counters.clear()
+        latencies.clear()
+        started = time.time()
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ─── Reporting ────────────────────────────────────────────────────────────────
+
+def summary(command):
+    with _lock:
+        return {
+            "command":  command,
+            "started":  datetime.fromtimestamp(started, timezone.utc).isoformat(timespec="seconds"),
+            "duration": round(time.time() - started, 3),
+            "stages":   {name: round(s, 3) for name, s in stages.items()},
+            "counters": dict(counters),
+            "latency":  {
+                name: {
+                    "count": len(samples),
+                    "p50":   round(percentile(samples, 0.50), 4),
+                    "p95":   round(percentile(samples, 0.95), 4),
+                }
+                for name, samples in latencies.items() if samples
+            },
+        }
+
+def prometheus(report):
+    label = f'command="{report["command"]}"'
+    lines = [
+        "# TYPE hearing_bot_run_duration_seconds gauge",
+        f"hearing_bot_run_duration_seconds{{{label}}} {report['duration']}",
+        f"hearing_bot_last_run_timestamp_seconds{{{label}}} {int(started)}",
+        "# TYPE hearing_bot_stage_seconds gauge",
+    ]
+    lines += [f'hearing_bot_stage_seconds{{{label},stage="{name}"}} {s}'
+              for name, s in report["stages"].items()]
+    lines.append("# TYPE hearing_bot_count gauge")
+    lines += [f'hearing_bot_count{{{label},name="{name}"}} {n}'
+              for name, n in report["counters"].items()]
+    lines.append("# TYPE hearing_bot_latency_seconds gauge")
+    for name, stats in report["latency"].items():
+        for q in ("p50", "p95"):
+            quantile = "0.5" if q == "p50" else "0.95"
+            lines.append(f'hearing_bot_latency_seconds{{{label},name="{name}",quantile="{quantile}"}} {stats[q]}')
+    return "\n".join(lines) + "\n"
+
+# Write <dir>/<command>.json and <dir>/hearing_bot_<command>.prom (node_exporter textfile format)
+def write(command, directory):
+    report = summary(command)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    (directory / f"{command}.json").write_text(json.dumps(report, indent=2))
+
+    # Write then rename so the textfile collector never reads a partial file
+    prom = directory / f"hearing_bot_{command}.prom"
+    tmp  = prom.with_suffix(f".prom.{os.getpid()}")
+    tmp.write_text(prometheus(report))
+    tmp.replace(prom)
+    return report
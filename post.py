@@ -1,15 +1,16 @@
-from fetch import fetch_event_detail
-from extract import get_URL
-import sqlite3
+from db import changes_since, get_conn
 from html import escape 
-from datetime import datetime
+from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
 import time
 
 
 # ─── Post upcoming meetings ─────────────────────────────────────────────────────
+# Rows of (date, committee, title, url) for this week's remaining hearings
 def post_upcoming():
-    conn = sqlite3.connect("hearings.db")
-    c = conn.cursor()
+    today = date.today()
+    sunday = today + timedelta(days=6 - today.weekday())
+    c = get_conn().cursor()
     c.execute("""
     SELECT
         date,
@@ -17,28 +18,26 @@ def post_upcoming():
         title, 
         url
     FROM hearings
-    WHERE date(date) >= date('now') 
-            AND strftime('%Y-%W', date) = strftime('%Y-%W', 'now')
-
-    ORDER BY date(date) ASC;       
+    WHERE date >= ? AND date <= ?
+    ORDER BY date ASC;       
             
-    """)
+    """, (today.isoformat(), sunday.isoformat()))
     rows = c.fetchall()
     if not rows:
         print("No upcoming hearings.")
     else:
         print(f"\nUpcoming hearings ({len(rows)}):")
         # print("Upcoming hearings:")
-        return post_slack(rows)
+        return rows
         # for ev_id, ev_date, title, committee in rows:
         #     print(f"{ev_date} | {committee} | {title}")
 
 
-# Post hearings that were last updated 
+# Post hearings that were last updated: (date_inserted, rows of (date, committee, title, url))
 def post_last_update():
-    conn = sqlite3.connect("hearings.db")
-    c = conn.cursor()
-    c.execute("SELECT MAX(date_inserted) FROM hearings WHERE date(date) >= date('now')")
+    today = date.today().isoformat()
+    c = get_conn().cursor()
+    c.execute("SELECT MAX(date_inserted) FROM hearings WHERE date >= ?", (today,))
     last_date = c.fetchone()[0] 
     print(last_date)
     if not last_date:
@@ -54,33 +53,29 @@ def post_last_update():
             title,
             url
         FROM hearings
-        WHERE date(date) >= date('now')
-        AND date(date_inserted) = ?
-        ORDER BY date(date) ASC
-    """, (last_date,))
+        WHERE date >= ?
+        AND date_inserted = ?
+        ORDER BY date ASC
+    """, (today, last_date))
 
     rows = c.fetchall()
     if not rows:
         print("None found")
     else: 
-        return post_slack(rows)
-
-# Post hearings that were changed since last check
-def post_changed():
-    conn = sqlite3.connect("hearings.db")
-    c = conn.cursor()
-    c.execute("""
-        SELECT 
-            date,
-            committee,
-            title,
-            url
-        FROM hearings
-        WHERE date(date) >= date('now')
-        AND status != 'Scheduled'
-        ORDER BY date(date) ASC
-    """)
-    rows = c.fetchall()
+        return last_date, rows
+
+# Post upcoming hearings with a change logged since `since` (UTC, ISO; default the last
+# day, one check_status run). Reads the change log refresh() writes, one row per hearing.
+def post_changed(since=None):
+    if since is None:
+        since = (datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1)).isoformat(timespec="seconds")
+    today = date.today().isoformat()
+    rows, seen = [], set()
+    for _, hearing_id, _, _, _, date_str, committee, title, url in changes_since(get_conn(), since):
+        if hearing_id in seen or date_str < today:
+            continue
+        seen.add(hearing_id)
+        rows.append((date_str, committee, title, url))
     if not rows:
         print("No changed hearings.")
         return
@@ -93,86 +88,85 @@ def format_date(date_str):
     date_obj = datetime.strptime(date_str, "%Y-%m-%d")
     return date_obj.strftime("%B %-d, %Y")
 
+# Group rows of (date_str, committee, title, url) by date: {date_str: ((committee, title, url), ...)}
+def group_by_date(rows):
+    by_date = {}
+    for date_str, committee, title, url in rows:
+        by_date.setdefault(date_str, []).append((committee, title, url))
+    return {date_str: tuple(entries) for date_str, entries in by_date.items()}
+
 # Structure hearings to post in Slack 
 def post_slack(rows):
     """
-    Given rows of (date_str, committee, title, url, status),
-    prints them grouped by date in a bullet list.
+    Given rows of (date_str, committee, title, url),
+    returns {date_str: blocks}, each date's hearings in a bullet list.
     """
-    
-    # print(rows)
-    by_date = {}
-
-    for date_str, committee, title, url in rows:
-        by_date[date_str] = by_date.get(date_str, [])
-        by_date[date_str].append((committee, title, url))
+    by_date = group_by_date(rows)
+    return {date_str: render_date(date_str, by_date[date_str]) for date_str in sorted(by_date)}
 
-    print(by_date)
+# Blocks for one date's (committee, title, url) entries. Rendering is cached, so a
+# date whose hearings didn't change is never rebuilt; treat the result as read-only.
+@lru_cache(maxsize=1024)
+def render_date(date_str, entries):
     blocks: list[dict] = []
-    daily_blocks: dict[str, list[dict]] = {}
-
-    for date_str in sorted(by_date):
-        blocks: list[dict] = []
-
-        # date_formatted = format_date(date_str)  # e.g. returns f"<!date^{unix_timestamp}^{{date}}|{date_str}>"
-        # 1) Date header (rich_text_section inside a rich_text block)
-        # date_formatted = date_formatting(date_str) # e.g. returns f"<!date^{unix_timestamp}^{{date}}|{date_str}>"
-
-        date_formatted = format_date(date_str)  # e.g. returns "June 1, 2024"
-        blocks.append({
-            "type": "rich_text",
-            "elements": [{
-                    "type": "rich_text_section",
-                    "elements": [{ "type": "text", "text": date_formatted, "style": {"bold": True} }]
-                }
-            ]
-        })
 
-        # 2) Bulleted list for that date
-        bullet_sections = []
-        for committee, title, url in by_date[date_str]:
-            # committee in **bold**
-            section_elems = [
-                {
-                    "type": "text",
-                    "text": f"{committee} | ",
-                    "style": {"bold": True}
-                }
-            ]
-
-            # linked or plain title
-            if url is not None and url != "":
-                section_elems.append({
-                    "type": "link",
-                    "url": url,
-                    "text": title
-                })
-            else:
-                section_elems.append({
-                    "type": "text",
-                    "text": title
-                })
-
-            bullet_sections.append({
+    # date_formatted = format_date(date_str)  # e.g. returns f"<!date^{unix_timestamp}^{{date}}|{date_str}>"
+    # 1) Date header (rich_text_section inside a rich_text block)
+    # date_formatted = date_formatting(date_str) # e.g. returns f"<!date^{unix_timestamp}^{{date}}|{date_str}>"
+
+    date_formatted = format_date(date_str)  # e.g. returns "June 1, 2024"
+    blocks.append({
+        "type": "rich_text",
+        "elements": [{
                 "type": "rich_text_section",
-                "elements": section_elems
+                "elements": [{ "type": "text", "text": date_formatted, "style": {"bold": True} }]
+            }
+        ]
+    })
+
+    # 2) Bulleted list for that date
+    bullet_sections = []
+    for committee, title, url in entries:
+        # committee in **bold**
+        section_elems = [
+            {
+                "type": "text",
+                "text": f"{committee} | ",
+                "style": {"bold": True}
+            }
+        ]
+
+        # linked or plain title
+        if url is not None and url != "":
+            section_elems.append({
+                "type": "link",
+                "url": url,
+                "text": title
+            })
+        else:
+            section_elems.append({
+                "type": "text",
+                "text": title
             })
 
-        blocks.append({
-            "type": "rich_text",
-            "elements": [
-                {
-                    "type": "rich_text_list",
-                    "style": "bullet",
-                    "indent": 0,
-                    "border": 0,
-                    "elements": bullet_sections      # ≤ 50 items allowed per list :contentReference[oaicite:0]{index=0}
-                }]
+        bullet_sections.append({
+            "type": "rich_text_section",
+            "elements": section_elems
         })
 
-        daily_blocks[date_str] = blocks
-
-    return daily_blocks
+    blocks.append({
+        "type": "rich_text",
+        "elements": [
+            {
+                "type": "rich_text_list",
+                "style": "bullet",
+                "indent": 0,
+                "border": 0,
+                "elements": bullet_sections      # ≤ 50 items allowed per list :contentReference[oaicite:0]{index=0}
+            }]
+    })
+
+    return blocks
 
         
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+HOT_FUNCTIONS   = 15  # rows of the printed hot-function summary
+TOP_ALLOCATIONS = 10  # allocation sites in the printed/tracemalloc summary
+
+
+# ─── Collection ─────────────────────────────────────────────────────────────────
+
+# Before 3.12 cProfile only sees the thread that enabled it, but detail fetches run
+# on the fetch and crawl pools. Threads started while profiling get their own
+# profiler (the first profile event swaps the hook for it); all of them are merged
+# into one dump. From 3.12 cProfile runs on sys.monitoring, already sees every
+# thread and refuses a second active profiler, so only the main one is used.
+PER_THREAD = sys.version_info < (3, 12)
+
+class _Profilers:
+    def __init__(self):
+        self.main    = cProfile.Profile()
+        self.threads = []
+        self._lock   = threading.Lock()
+
+    def _hook(self, frame, event, arg):
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.threads.append(profiler)
+        profiler.enable()
+
+    def start(self):
+        if PER_THREAD:
+            threading.setprofile(self._hook)
+        self.main.enable()
+
+    def stop(self):
+        self.main.disable()
+        if PER_THREAD:
+            threading.setprofile(None)
+        stats = pstats.Stats(self.main)
+        with self._lock:
+            for profiler in self.threads:
+                stats.add(profiler)
+        return stats
+
+
+# ─── Reporting ──────────────────────────────────────────────────────────────────
+
+def hot_functions(stats, limit=HOT_FUNCTIONS):
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats("tottime").print_stats(limit)
+    # Drop pstats' preamble ("Ordered by", "List reduced from") down to the table
+    lines = out.getvalue().splitlines()
+    start = next((i for i, line in enumerate(lines) if line.lstrip().startswith("ncalls")), 0)
+    return "\n".join(line for line in lines[start:] if line.strip())
+
+def top_allocations(snapshot, limit=TOP_ALLOCATIONS):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, pstats.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    return "\n".join(f"{stat.size / 1024:9.1f} KiB {stat.count:8} blocks  {stat.traceback}"
+                     for stat in snapshot.statistics("lineno")[:limit])
+
+
+# ─── Profile a run ──────────────────────────────────────────────────────────────
+
+# Profile one command: CPU (cProfile, all threads) and Python allocations
+# (tracemalloc). Writes <run id>.pstats, <run id>.tracemalloc and a text summary
+# to out_dir and prints the hottest functions. Load the dumps with
+# pstats.Stats(path) / tracemalloc.Snapshot.load(path), or snakeviz.
+@contextmanager
+def profiled(command, out_dir):
+    run_id = f"{command}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{os.getpid()}"
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tracemalloc.start()
+    profilers = _Profilers()
+    profilers.start()
+    try:
+        yield run_id
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        stats = profilers.stop()
+        tracemalloc.stop()
+
+        stats.dump_stats(out_dir / f"{run_id}.pstats")
+        snapshot.dump(str(out_dir / f"{run_id}.tracemalloc"))
+        summary = (f"Profile {run_id}: {stats.total_tt:.2f}s, "
+                   f"peak traced memory {peak / 2**20:.1f} MiB\n\n"
+                   f"Hot functions (self time):\n{hot_functions(stats)}\n\n"
+                   f"Top allocations:\n{top_allocations(snapshot)}\n")
+        (out_dir / f"{run_id}.txt").write_text(summary)
+        print(summary)
+        print(f"Profile written to {out_dir / run_id}.*")
@@ -0,0 +1,121 @@
+import fcntl
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from db import DATABASE_PATH
+import metrics
+
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+# Shared by every process using the Fly volume, like http_cache.db
+QUOTA_PATH = os.getenv("QUOTA_PATH", str(Path(DATABASE_PATH).with_name("quota.db")))
+API_QUOTA  = int(os.getenv("API_QUOTA", "5000"))  # Congress.gov requests per hour per key
+RATE       = API_QUOTA / 3600                      # tokens refilled per second
+BATCH      = int(os.getenv("API_QUOTA_BATCH", "10"))  # tokens taken from the shared bucket at once
+
+# Share of the hourly quota each priority must leave for the ones above it.
+# New-event ingest may spend the bucket down to zero; refreshes stop at 10% so an
+# update can still run, and bulk crawls stop at 25%.
+RESERVES = {
+    "ingest":  0.0,
+    "refresh": 0.10,
+    "bulk":    0.25,
+}
+
+# Priority of each hearing_bot.py command's API calls
+COMMAND_PRIORITIES = {
+    "update":       "ingest",
+    "check_status": "refresh",
+    "backfill":     "refresh",
+    "crawl":        "bulk",
+}
+
+priority = "ingest"  # set per command by hearing_bot.run()
+
+_lock = threading.Lock()
+_conn = None
+_lock_file = None
+_local = 0  # tokens this process took from the bucket and has not spent yet
+
+
+# ─── Storage ──────────────────────────────────────────────────────────────────
+
+# One row: tokens left and when they were last counted. The lock file serializes
+# processes; _lock serializes this process's threads (flock doesn't). WAL with
+# synchronous=NORMAL keeps each take from waiting on an fsync of the volume.
+@contextmanager
+def _locked():
+    global _conn, _lock_file
+    with _lock:
+        if _conn is None:
+            _conn = sqlite3.connect(QUOTA_PATH, check_same_thread=False, isolation_level=None)
+            _conn.execute("PRAGMA journal_mode = WAL")
+            _conn.execute("PRAGMA synchronous = NORMAL")
+            _conn.execute("""
+                CREATE TABLE IF NOT EXISTS bucket (
+                    id      INTEGER PRIMARY KEY CHECK (id = 1),
+                    tokens  REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """)
+            _lock_file = open(QUOTA_PATH + ".lock", "w")
+        fcntl.flock(_lock_file, fcntl.LOCK_EX)
+        try:
+            yield _conn
+        finally:
+            fcntl.flock(_lock_file, fcntl.LOCK_UN)
+
+def _refill(conn, now):
+    row = conn.execute("SELECT tokens, updated FROM bucket WHERE id = 1").fetchone()
+    if row is None:
+        return float(API_QUOTA)
+    tokens, updated = row
+    return min(float(API_QUOTA), tokens + max(0.0, now - updated) * RATE)
+
+def _save(conn, tokens, now):
+    conn.execute("INSERT OR REPLACE INTO bucket (id, tokens, updated) VALUES (1, ?, ?)", (tokens, now))
+
+
+# ─── Quota ────────────────────────────────────────────────────────────────────
+
+# Take one request from the shared budget, waiting for the refill when the current
+# priority's share is used up. Runs slow down to the refill rate instead of failing.
+# Tokens are taken BATCH at a time, so most requests only touch _local; at most
+# BATCH - 1 tokens go unspent when the process exits.
+def acquire(prio=None):
+    global _local
+    with _lock:
+        if _local:
+            _local -= 1
+            return
+
+    reserve = RESERVES[prio or priority] * API_QUOTA
+    waited  = 0.0
+    while True:
+        now = time.time()
+        with _locked() as conn:
+            if _local:  # another thread took a batch meanwhile
+                _local -= 1
+                break
+            tokens = _refill(conn, now)
+            take = min(BATCH, int(tokens - reserve))
+            if take >= 1:
+                _save(conn, tokens - take, now)
+                _local = take - 1
+                break
+        wait = (reserve + 1 - tokens) / RATE
+        if not waited and wait >= 1:
+            print(f"API quota low ({tokens:.0f} left), waiting {wait:.0f}s")
+        time.sleep(wait)
+        waited += wait
+    if waited:
+        metrics.add_time("quota_wait", waited)
+
+# Requests left in the shared hourly budget
+def remaining():
+    with _locked() as conn:
+        return _refill(conn, time.time())
@@ -0,0 +1,48 @@
+from db import get_conn, unpack
+import metrics
+from extract import normalize
+
+
+BATCH_SIZE = 500  # payloads decoded and written per transaction
+
+
+# Rebuild the hearings columns from the latest archived payload of every event.
+# Reads the archive with a streaming cursor, so memory stays flat; no API calls.
+def reextract(batch_size=BATCH_SIZE):
+    conn = get_conn()
+    reader = conn.cursor()
+    writer = conn.cursor()
+
+    # SQLite returns the body of the row holding MAX(fetched_at) for each group
+    reader.execute("""
+        SELECT p.event_id, p.body, MAX(p.fetched_at),
+               h.date, h.title, h.committee, h.URL, h.status
+        FROM payloads p
+        JOIN hearings h ON h.id = p.event_id
+        GROUP BY p.event_id
+    """)
+
+    seen = changed = 0
+    while rows := reader.fetchmany(batch_size):
+        updates = []
+        for ev_id, body, _, *current in rows:
+            seen += 1
+            try:
+                hearing = normalize(unpack(body))
+                new = list(hearing.fields())
+            except Exception as e:
+                print(f"Error re-extracting {ev_id}: {e}")
+                continue
+            if new != current:
+                updates.append((*new, hearing.digest(), hearing.fingerprint(), ev_id))
+
+        with metrics.stage("db_write"), conn:
+            writer.executemany("""
+                UPDATE hearings
+                SET date = ?, title = ?, committee = ?, URL = ?, status = ?, content_hash = ?, fingerprint = ?
+                WHERE id = ?
+            """, updates)
+        changed += len(updates)
+
+    print(f"Re-extracted {seen} archived payloads, {changed} hearings changed.")
+    return changed
@@ -0,0 +1,101 @@
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+from db import get_conn, last_runs, record_run
+
+
+# ─── Schedule ───────────────────────────────────────────────────────────────────
+
+JITTER = int(os.getenv("SCHEDULE_JITTER", "300"))  # seconds added at random to every run
+TICK   = 30                                         # how often the loop looks for due jobs
+
+# (command, "HH:MM" UTC, ISO weekdays) – the same times as cron/weekday.cron and
+# cron/weekly.cron. Jobs sharing a time run one after another in this order (update
+# before backfill, so new hearings get their URLs the same day), after one jitter for
+# the whole slot.
+SCHEDULE = [
+    ("check_status", "13:00", (1, 2, 3, 4, 5)),
+    ("update",       "13:00", (1, 2, 3, 4, 5)),
+    ("backfill",     "13:00", (1, 2, 3, 4, 5)),
+    ("upcoming",     "14:00", (1,)),
+]
+
+
+# The commands due at one time on the same weekdays, in schedule order
+class Slot:
+    __slots__ = ("names", "hour", "minute", "weekdays", "next_run")
+
+    def __init__(self, at, weekdays):
+        self.names = []
+        self.hour, self.minute = map(int, at.split(":"))
+        self.weekdays = weekdays
+        self.next_run = None
+
+    @property
+    def name(self):
+        return ", ".join(self.names)
+
+    # Today's slot if it is due and has not run since (last_run, an aware datetime, is
+    # older), so a restart just after the slot time doesn't skip the day. Otherwise the
+    # first slot strictly after now, plus jitter so restarts don't all hit the API at :00.
+    def schedule(self, now, last_run=None):
+        slot = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if slot <= now and slot.isoweekday() in self.weekdays and (last_run is None or last_run < slot):
+            self.next_run = now
+            return self.next_run
+        while slot <= now or slot.isoweekday() not in self.weekdays:
+            slot += timedelta(days=1)
+        self.next_run = slot + timedelta(seconds=random.uniform(0, JITTER))
+        return self.next_run
+
+
+# ─── Loop ───────────────────────────────────────────────────────────────────────
+
+def slots(schedule=SCHEDULE):
+    by_time = {}
+    for name, at, weekdays in schedule:
+        by_time.setdefault((at, tuple(weekdays)), Slot(at, tuple(weekdays))).names.append(name)
+    return list(by_time.values())
+
+# Run the scheduled commands until stop is set. run(name) executes one command;
+# jobs run one at a time on this thread, so two runs never overlap in-process, and
+# a slot that passes while an earlier job is still running is run once, late,
+# rather than queued repeatedly. Each completed slot is recorded in the database, so
+# a restart runs today's slot right away if it came due while the process was down.
+def run_forever(run, stop, schedule=SCHEDULE):
+    conn = get_conn()
+    jobs = slots(schedule)
+    now  = datetime.now(timezone.utc)
+    ran  = last_runs(conn)
+    for job in jobs:
+        last_run = datetime.fromisoformat(ran[job.name]) if job.name in ran else None
+        print(f"Scheduled {job.name} at {job.schedule(now, last_run):%Y-%m-%d %H:%M:%S} UTC")
+
+    while not stop.is_set():
+        for job in jobs:
+            if stop.is_set():
+                break
+            started = datetime.now(timezone.utc)
+            if started < job.next_run:
+                continue
+            for name in job.names:
+                if stop.is_set():
+                    break
+                try:
+                    run(name)
+                except Exception as e:
+                    print(f"Scheduled {name} failed: {e}")
+            else:  # not interrupted by stop: a restart need not run this slot again today
+                record_run(conn, job.name, started.isoformat(timespec="seconds"))
+            next_run = job.schedule(datetime.now(timezone.utc), started)
+            print(f"Next {job.name} at {next_run:%Y-%m-%d %H:%M:%S} UTC")
+        stop.wait(TICK)
+
+def start(run, schedule=SCHEDULE):
+    stop   = threading.Event()
+    thread = threading.Thread(target=run_forever, args=(run, stop, schedule),
+                              name="scheduler", daemon=True)
+    thread.start()
+    return thread, stop
@@ -0,0 +1,159 @@
+import bisect
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+import db
+from db import get_conn
+from deliver import chunk_messages
+from post import post_slack
+
+
+VIEW_POLL = float(os.getenv("VIEW_POLL", "2"))  # seconds between checks for new writes
+
+HELP = ("Usage: `/hearings` (this week), `/hearings next 14` (next N days), "
+        "`/hearings committee judiciary`, `/hearings <keyword>`")
+
+
+# ─── Upcoming view ──────────────────────────────────────────────────────────────
+
+# In-memory copy of the upcoming hearings, kept current from the hearings.rev column.
+# Queries only read the current snapshot, a date-sorted tuple swapped in whole,
+# so requests never touch SQLite and never wait on a refresh.
+class UpcomingView:
+    def __init__(self, path=None):
+        get_conn()  # make sure the schema (rev column + triggers) exists
+        # A connection of its own: PRAGMA data_version only moves for other connections' commits
+        self.conn = sqlite3.connect(path or db.DATABASE_PATH, check_same_thread=False)
+        self.rows = {}          # id -> (date, committee, title, url), "" for missing values
+        self.rev = 0            # highest hearings.rev applied
+        self.data_version = None
+        self.generation = 0     # bumped with every new snapshot (keys the answer cache)
+        self.snapshot = ()
+        self.listeners = []     # called with the view after every new snapshot
+        self._lock = threading.Lock()
+
+    # Apply rows written since the last refresh; returns True if the snapshot changed
+    def refresh(self):
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self.data_version:
+                return False
+            self.data_version = version
+
+            today = date.today().isoformat()
+            if not self.rev:
+                self.rev = self.conn.execute("SELECT IFNULL(MAX(rev), 0) FROM hearings").fetchone()[0]
+                changed = self.conn.execute(
+                    "SELECT id, rev, date, committee, title, URL FROM hearings WHERE date >= ?", (today,))
+            else:
+                changed = self.conn.execute(
+                    "SELECT id, rev, date, committee, title, URL FROM hearings WHERE rev > ?", (self.rev,))
+
+            updated = False
+            for ev_id, rev, *row in changed:
+                self.rev = max(self.rev, rev or 0)
+                if row[0] and row[0] >= today:
+                    self.rows[ev_id] = tuple(value or "" for value in row)
+                elif self.rows.pop(ev_id, None) is None:
+                    continue
+                updated = True
+
+            if updated:
+                # Drop hearings that have passed since the last snapshot while we're at it
+                self.rows = {ev_id: row for ev_id, row in self.rows.items() if row[0] >= today}
+                self.snapshot = tuple(sorted(self.rows.values()))
+                self.generation += 1
+        if updated:
+            for listener in self.listeners:
+                listener(self)
+        return updated
+
+    # Hearings from start to end (inclusive, "YYYY-MM-DD"), in date order
+    def between(self, start, end=None):
+        snapshot = self.snapshot
+        lo = bisect.bisect_left(snapshot, (start,))
+        hi = len(snapshot) if end is None else bisect.bisect_right(snapshot, (end, "\uffff"))
+        return snapshot[lo:hi]
+
+    # Poll for new writes in the background for as long as the process runs
+    def start(self, interval=VIEW_POLL):
+        def poll():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing upcoming view: {e}")
+                threading.Event().wait(interval)
+
+        self.refresh()
+        threading.Thread(target=poll, name="upcoming-view", daemon=True).start()
+        return self
+
+
+# ─── /hearings ──────────────────────────────────────────────────────────────────
+
+# (title, matching rows) for the text after /hearings
+def search(view, text, today):
+    words = text.split()
+    start = today.isoformat()
+
+    if not words or words == ["week"]:
+        sunday = today + timedelta(days=6 - today.weekday())
+        return "Hearings this week", view.between(start, sunday.isoformat())
+
+    if m := re.fullmatch(r"(?:next\s+)?(\d+)(?:\s+days?)?", text.strip(), re.I):
+        days = int(m.group(1))
+        end  = today + timedelta(days=max(days - 1, 0))
+        return f"Hearings in the next {days} days", view.between(start, end.isoformat())
+
+    if words[0].lower() == "committee" and len(words) > 1:
+        name = " ".join(words[1:]).lower()
+        return (f"Upcoming hearings for committees matching “{name}”",
+                [row for row in view.between(start) if name in row[1].lower()])
+
+    keyword = text.strip().lower()
+    return (f"Upcoming hearings matching “{keyword}”",
+            [row for row in view.between(start)
+             if keyword in row[2].lower() or keyword in row[1].lower()])
+
+# The slash command response. Identical queries against the same snapshot on the
+# same day are answered from a cache, which keeps bursts of the same command cheap.
+@lru_cache(maxsize=256)
+def _answer(view, generation, text, today):
+    if text.strip().lower() == "help":
+        return {"response_type": "ephemeral", "text": HELP}
+
+    title, rows = search(view, text, today)
+    if not rows:
+        return {"response_type": "ephemeral", "text": f"{title}: none found."}
+
+    daily_blocks = post_slack(rows)
+    header   = {"type": "section", "text": {"type": "mrkdwn", "text": f"*{title} ({len(rows)})*"}}
+    messages = chunk_messages([header] + [block for day in sorted(daily_blocks) for block in daily_blocks[day]])
+    text = f"{title} ({len(rows)})"
+    if len(messages) > 1:
+        text += " – showing the first dates, narrow the search to see the rest"
+    return {"response_type": "ephemeral", "text": text, "blocks": messages[0]}
+
+def answer(view, text):
+    return _answer(view, view.generation, text or "", date.today())
+
+
+# Add POST /slack/commands (the /hearings request URL) to the Flask app
+def register(app, view):
+    from flask import abort, jsonify, request
+    from slack_sdk.signature import SignatureVerifier
+
+    verifier = SignatureVerifier(os.environ["SIGNING_SECRET"])
+
+    @app.post("/slack/commands")
+    def slash_command():
+        if not verifier.is_valid_request(request.get_data(), request.headers):
+            abort(403)
+        return jsonify(answer(view, request.form.get("text", "")))
+
+    return app
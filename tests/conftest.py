@@ -0,0 +1,50 @@
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db
+
+
+# The hearings table as the first release created it, before any migration
+BASELINE_SCHEMA = """
+    CREATE TABLE hearings (
+        id        TEXT PRIMARY KEY,
+        date      TEXT,
+        title     TEXT,
+        committee TEXT,
+        URL       TEXT,
+        API_call  TEXT,
+        date_inserted TEXT,
+        status    TEXT
+    )
+"""
+
+def day(offset):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+# An empty database at db.DATABASE_PATH; db.get_conn() opens and migrates it
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "hearings.db"
+    monkeypatch.setattr(db, "DATABASE_PATH", str(path))
+    db.close()
+    yield path
+    db.close()
+
+# A baseline-shaped database holding rows, opened through db.get_conn()
+@pytest.fixture
+def baseline(db_path):
+    def create(rows=()):
+        raw = sqlite3.connect(db_path)
+        raw.execute(BASELINE_SCHEMA)
+        raw.executemany("INSERT INTO hearings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        raw.commit()
+        raw.close()
+        return db.get_conn()
+    return create
@@ -0,0 +1,83 @@
+from conftest import day
+
+import alerts
+import db
+import update
+from alerts import KeywordMatcher
+from dedup import DedupIndex
+
+
+SUBSCRIPTIONS = {
+    "#water":  ["water rights", "Irrigation"],
+    "#tribal": ["tribal", "Indian Affairs", "water rights"],
+}
+
+
+def test_matches_on_word_boundaries():
+    matcher = KeywordMatcher(SUBSCRIPTIONS)
+    assert matcher.route("Tribal water rights settlements") == {
+        "#water":  ["water rights"],
+        "#tribal": ["water rights", "tribal"],
+    }
+    assert matcher.route("Tribalism and irrigationists") == {}
+
+def test_ignores_case_whitespace_and_punctuation():
+    matcher = KeywordMatcher({"#water": ["water-rights"]})
+    for title in ("Water  Rights", "water-rights", "WATER/RIGHTS: an overview", "(water rights)"):
+        assert matcher.route(title) == {"#water": ["water rights"]}, title
+
+def test_matches_committee_text():
+    matcher = KeywordMatcher(SUBSCRIPTIONS)
+    assert matcher.route("Oversight hearing", "Senate Indian Affairs (Select) Committee") == {
+        "#tribal": ["indian affairs"],
+    }
+
+def test_overlapping_keywords_all_found():
+    matcher = KeywordMatcher({"#a": ["rights", "water rights", "water"]})
+    assert matcher.route("Water rights") == {"#a": ["rights", "water rights", "water"]}
+
+def test_no_subscriptions():
+    matcher = KeywordMatcher({})
+    assert matcher.route("Tribal water rights") == {}
+    assert not matcher.keywords
+
+
+# Listing items as Congress.gov returns them: no committee, so exclusion can only
+# happen once the detail is fetched
+def listing_item(ev_id):
+    return {"eventId": ev_id, "chamber": "Senate", "congress": 119, "updateDate": f"{day(-1)}T00:00:00Z",
+            "url": f"https://api/{ev_id}"}
+
+def excluded_detail(urls):
+    return [{
+        "eventId": "1", "date": f"{day(3)}T14:00:00Z", "title": "Tribal water rights",
+        "committees": [{"name": "Senate Indian Affairs (Select) Committee"}], "meetingStatus": "Scheduled",
+    } for _ in urls]
+
+
+# An event in an excluded committee still reaches keyword subscribers, but not the digest
+def test_excluded_committee_alerts_subscribers(db_path, monkeypatch):
+    monkeypatch.setattr(alerts, "get_matcher", lambda: KeywordMatcher(SUBSCRIPTIONS))
+    monkeypatch.setattr(update, "fetch_details", excluded_detail)
+    conn = db.get_conn()
+
+    new_hearings, upcoming, matched, _, failed = update.process_events([listing_item("1")],
+                                                                       DedupIndex(conn, ["1"]))
+
+    assert [row[0] for row in new_hearings] == ["1"]
+    assert upcoming == []
+    assert sorted(channel for channel, _ in matched) == ["#tribal", "#water"]
+    assert failed == []
+
+# Without subscriptions the excluded event is still fetched and stored, then left out
+def test_excluded_committee_dropped_after_detail(db_path, monkeypatch):
+    monkeypatch.setattr(alerts, "get_matcher", lambda: KeywordMatcher({}))
+    fetched = []
+    monkeypatch.setattr(update, "fetch_details", lambda urls: fetched.extend(urls) or excluded_detail(urls))
+    conn = db.get_conn()
+
+    new_hearings, upcoming, matched, _, _ = update.process_events([listing_item("1")], DedupIndex(conn, ["1"]))
+
+    assert fetched == ["https://api/1"]
+    assert [row[0] for row in new_hearings] == ["1"]
+    assert upcoming == [] and matched == []
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+from conftest import day
+
+import backfill
+import post
+
+
+def meeting(ev_id, date_str, title="Budget hearing", status="Scheduled", url="https://docs/1.pdf"):
+    return {
+        "eventId":          ev_id,
+        "date":             f"{date_str}T14:00:00Z",
+        "title":            title,
+        "committees":       [{"name": "House Budget"}],
+        "meetingStatus":    status,
+        "meetingDocuments": [{"url": url}] if url else [],
+    }
+
+def stored(conn, ev_id):
+    return conn.execute("""
+        SELECT date, title, status, URL, next_check_at, last_checked_at
+        FROM hearings WHERE id = ?
+    """, (ev_id,)).fetchone()
+
+def select(conn, *ids):
+    marks = ",".join("?" * len(ids))
+    return conn.execute(f"SELECT {backfill.REFRESH_COLUMNS} FROM hearings WHERE id IN ({marks}) ORDER BY id",
+                        ids).fetchall()
+
+
+def test_refresh_applies_and_logs_changes(baseline, monkeypatch):
+    conn = baseline([("1", day(5), "Budget hearing", "House Budget", "https://docs/1.pdf",
+                      "https://api/1", day(-1), "Scheduled")])
+    monkeypatch.setattr(backfill, "fetch_event_detail",
+                        lambda url: meeting("1", day(6), status="Postponed"))
+
+    checked, changes = backfill.refresh(conn, select(conn, "1"), datetime.now())
+
+    assert checked == ["1"]
+    assert sorted(field for _, field, _, _ in changes) == ["date", "status"]
+    date_str, _, status, url, next_check_at, last_checked_at = stored(conn, "1")
+    assert (date_str, status, url) == (day(6), "Postponed", "https://docs/1.pdf")
+    assert next_check_at and last_checked_at
+    assert conn.execute("SELECT COUNT(*) FROM changes WHERE hearing_id = '1'").fetchone()[0] == 2
+
+def test_refresh_keeps_url_missing_upstream(baseline, monkeypatch):
+    conn = baseline([("1", day(5), "Budget hearing", "House Budget", "https://docs/1.pdf",
+                      "https://api/1", day(-1), "Scheduled")])
+    monkeypatch.setattr(backfill, "fetch_event_detail", lambda url: meeting("1", day(5), url=None))
+
+    _, changes = backfill.refresh(conn, select(conn, "1"), datetime.now())
+
+    assert changes == []
+    assert stored(conn, "1")[3] == "https://docs/1.pdf"
+
+def test_refresh_reschedules_failed_rows(baseline, monkeypatch):
+    conn = baseline([
+        ("1", day(5), "Budget hearing", "House Budget", "", "https://api/1", day(-1), "Scheduled"),
+        ("2", day(5), "Budget hearing", "House Budget", "", "https://api/2", day(-1), "Scheduled"),
+    ])
+    monkeypatch.setattr(backfill, "fetch_event_detail",
+                        lambda url: None if url.endswith("/2") else meeting("1", day(5)))
+
+    checked, _ = backfill.refresh(conn, select(conn, "1", "2"), datetime.now())
+
+    assert checked == ["1"]
+    assert stored(conn, "2")[4] is not None  # not picked first again by the next run
+
+# post_changed() posts what refresh() logged, once per hearing, and only upcoming ones
+def test_post_changed_reads_change_log(baseline, monkeypatch):
+    conn = baseline([
+        ("1", day(5), "Budget hearing", "House Budget", "https://docs/1.pdf", "https://api/1", day(-1),
+         "Scheduled"),
+        ("2", day(5), "Budget hearing", "House Budget", "https://docs/1.pdf", "https://api/2", day(-1),
+         "Scheduled"),
+    ])
+    monkeypatch.setattr(backfill, "fetch_event_detail",
+                        lambda url: meeting("1", day(6), status="Postponed") if url.endswith("/1")
+                        else meeting("2", day(5)))
+    backfill.refresh(conn, select(conn, "1", "2"), datetime.now(timezone.utc).replace(tzinfo=None))
+    posted = []
+    monkeypatch.setattr(post, "post_slack", posted.append)
+
+    post.post_changed()
+
+    assert posted == [[(day(6), "House Budget", "Budget hearing", "https://docs/1.pdf")]]
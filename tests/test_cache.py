@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import cache
+import fetch
+
+
+URL = "https://api/committee-meeting/119/house/1"
+
+
+@pytest.fixture
+def http_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_PATH", str(tmp_path / "http_cache.db"))
+    monkeypatch.setattr(cache, "_conn", None)
+    monkeypatch.setattr(cache, "stats", dict.fromkeys(cache.stats, 0))
+    yield
+    if cache._conn is not None:
+        cache._conn.close()
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.text        = json.dumps(payload) if payload is not None else ""
+        self.headers     = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+# Replace the API with responses, recording the headers of each request
+@pytest.fixture
+def api(monkeypatch):
+    requests = []
+    responses = []
+
+    def get(url, headers=None, **kwargs):
+        requests.append(headers or {})
+        return responses.pop(0)
+
+    monkeypatch.setattr(fetch, "_get", get)
+    return requests, responses
+
+def age(url, seconds):
+    with cache._db() as conn:
+        conn.execute("UPDATE responses SET fetched_at = fetched_at - ?, used_at = used_at - ? WHERE url = ?",
+                     (seconds, seconds, url))
+
+
+def test_fresh_entry_is_served_without_a_request(http_cache, api):
+    requests, responses = api
+    responses.append(FakeResponse(200, {"committeeMeeting": {"eventId": "1"}}, {"ETag": '"v1"'}))
+
+    assert fetch.fetch_event_detail(URL) == {"eventId": "1"}
+    assert fetch.fetch_event_detail(URL) == {"eventId": "1"}
+    assert len(requests) == 1
+    assert cache.stats["hits"] == 1
+
+def test_stale_entry_is_revalidated(http_cache, api):
+    requests, responses = api
+    responses.append(FakeResponse(200, {"committeeMeeting": {"eventId": "1"}},
+                                  {"ETag": '"v1"', "Last-Modified": "Mon, 01 Sep 2025 00:00:00 GMT"}))
+    fetch.fetch_event_detail(URL)
+    age(URL, cache.CACHE_TTL + 1)
+
+    responses.append(FakeResponse(304))
+    assert fetch.fetch_event_detail(URL) == {"eventId": "1"}
+    assert requests[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Sep 2025 00:00:00 GMT"}
+    assert cache.stats["revalidated"] == 1
+    assert cache.lookup(URL)[3]  # the 304 restarted the TTL
+
+    age(URL, cache.CACHE_TTL + 1)
+    responses.append(FakeResponse(200, {"committeeMeeting": {"eventId": "1", "title": "New"}}, {"ETag": '"v2"'}))
+    assert fetch.fetch_event_detail(URL) == {"eventId": "1", "title": "New"}
+    assert cache.lookup(URL)[1] == '"v2"'
+
+def test_evicts_expired_then_least_recently_used(http_cache, monkeypatch):
+    for name in ("old", "a", "b", "c"):
+        cache.store(f"https://api/{name}", "x" * 100)
+    age("https://api/old", cache.CACHE_EXPIRE + 1)
+    age("https://api/a", 30)
+    age("https://api/b", 20)
+    monkeypatch.setattr(cache, "CACHE_MAX_BYTES", 150)
+
+    assert cache.evict() == 3
+    assert cache.lookup("https://api/c") is not None
+    assert [cache.lookup(f"https://api/{name}") for name in ("old", "a", "b")] == [None] * 3
+    assert cache.stats["evicted"] == 3
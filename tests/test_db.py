@@ -0,0 +1,101 @@
+from conftest import day
+
+import backfill
+import db
+import post
+
+
+# SQL statements run while calling fn, with their parameters bound
+def executed(conn, fn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+def plan(conn, sql):
+    return " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+def rows(n):
+    return [(str(i), day(i % 60 - 30), f"Hearing {i}", "House Judiciary", "", f"https://api/{i}",
+             day(-(i % 5)), "Scheduled" if i % 3 else "Cancelled")
+            for i in range(n)]
+
+
+def test_migration_normalizes_dates(baseline):
+    conn = baseline([
+        ("1", "2025-06-18T14:00:00Z", "Budget", "House Budget", "", "https://api/1",
+         "2025-06-01 09:30:00", "Scheduled"),
+        ("2", "2025-06-19", "Water", "Senate Energy", "", "https://api/2", "2025-06-02", "Scheduled"),
+    ])
+    assert conn.execute("SELECT id, date, date_inserted FROM hearings ORDER BY id").fetchall() == [
+        ("1", "2025-06-18", "2025-06-01"),
+        ("2", "2025-06-19", "2025-06-02"),
+    ]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+
+def test_migration_numbers_and_fingerprints_rows(baseline):
+    conn = baseline(rows(10))
+    assert conn.execute("SELECT COUNT(*) FROM hearings WHERE rev IS NULL OR fingerprint IS NULL"
+                        ).fetchone()[0] == 0
+
+
+# Every read the digests and check_status run is a range scan on an index
+def assert_indexed(conn, statements):
+    assert statements
+    for sql in statements:
+        query_plan = plan(conn, sql)
+        assert query_plan.startswith("SEARCH hearings USING"), (sql, query_plan)
+        assert "SCAN hearings" not in query_plan, (sql, query_plan)
+
+def test_post_upcoming_uses_index(baseline):
+    conn = baseline(rows(200))
+    assert_indexed(conn, executed(conn, post.post_upcoming))
+
+def test_post_last_update_uses_index(baseline):
+    conn = baseline(rows(200))
+    assert_indexed(conn, executed(conn, post.post_last_update))
+
+def test_post_changed_uses_index(baseline, monkeypatch):
+    conn = baseline(rows(200))
+    monkeypatch.setattr(post, "post_slack", lambda rows: {})
+    statements = executed(conn, post.post_changed)
+    assert statements
+    for sql in statements:
+        query_plan = plan(conn, sql)
+        assert query_plan.startswith("SEARCH c USING INDEX changes_changed_at"), (sql, query_plan)
+        assert "SCAN" not in query_plan, (sql, query_plan)
+
+def test_check_status_uses_index(baseline, monkeypatch):
+    conn = baseline(rows(200))
+    monkeypatch.setattr(backfill, "refresh", lambda conn, rows, now: ([], []))
+    statements = executed(conn, backfill.check_status)
+    assert_indexed(conn, [sql for sql in statements if "next_check_at" in sql])
+
+def test_search_treats_punctuation_as_text(baseline):
+    conn = baseline([
+        ("1", day(5), "H.R. 471, the water-rights settlement act", "House Natural Resources", "",
+         "https://api/1", day(-1), "Scheduled"),
+        ("2", day(5), "Tribal water rights", "Senate Indian Affairs", "", "https://api/2", day(-1),
+         "Scheduled"),
+    ])
+
+    assert [row[2] for row in db.search(conn, "H.R. 471")] == ["H.R. 471, the water-rights settlement act"]
+    assert len(db.search(conn, "water-rights")) == 2
+    assert db.search(conn, 'tribal "water') == db.search(conn, "tribal water")
+    assert db.search(conn, "committee:judiciary OR") == []
+
+def test_rows_written_counts_cursor_writes(baseline):
+    conn = baseline([("1", day(5), "Budget hearing", "House Budget", "", "https://api/1", day(-1),
+                      "Scheduled")])
+    before = conn.rows_written
+
+    conn.execute("UPDATE hearings SET title = 'Budget' WHERE id = '1'")
+    cursor = conn.cursor()
+    cursor.executemany("UPDATE hearings SET status = ? WHERE id = ?", [("Postponed", "1"), ("x", "2")])
+    cursor.execute("DELETE FROM hearings WHERE id = '1'")
+    cursor.execute("SELECT * FROM hearings").fetchall()
+
+    assert conn.rows_written - before == 3  # the rev and FTS trigger writes are not counted
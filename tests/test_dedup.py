@@ -0,0 +1,55 @@
+from conftest import day
+
+import db
+from dedup import DedupIndex
+from extract import Hearing
+
+
+HEARING_API = "https://api.congress.gov/v3/hearing/119/house/{}"
+MEETING_API = "https://api.congress.gov/v3/committee-meeting/119/house/{}"
+
+
+def hearing(title="Legislative Hearing on H.R. 471", committee="House Natural Resources"):
+    return Hearing(day(3), title, committee, "", "Scheduled")
+
+def store(conn, ev_id, api_call, h):
+    db.insert_hearings(conn, [(ev_id, h.date, h.title, h.committee, h.url, day(0), api_call,
+                               h.status, h.digest(), h.fingerprint())])
+
+
+def test_merges_same_event_across_endpoints_on_one_page(db_path):
+    index = DedupIndex(db.get_conn(), ["1", "2"])
+    assert index.canonical("1", HEARING_API.format(1), hearing(), {}) is None
+    assert index.canonical("2", MEETING_API.format(2), hearing("LEGISLATIVE HEARING ON H.R. 471"), {}) == "1"
+    assert index.merged == 1
+
+def test_merges_with_stored_record_from_other_endpoint(db_path):
+    conn = db.get_conn()
+    store(conn, "1", MEETING_API.format(1), hearing())
+    index = DedupIndex(conn, ["2"])
+    assert index.canonical("2", HEARING_API.format(2), hearing(), {}) == "1"
+    index.save()
+    assert db.existing_ids(conn, ["2"]) == {"2"}
+
+def test_keeps_distinct_meetings_of_one_endpoint(db_path):
+    conn = db.get_conn()
+    store(conn, "1", MEETING_API.format(1), hearing("Business meeting"))
+    index = DedupIndex(conn, ["2", "3"])
+    assert index.canonical("2", MEETING_API.format(2), hearing("Business meeting"), {}) is None
+    assert index.canonical("3", MEETING_API.format(3), hearing("Business meeting"), {}) is None
+    assert index.merged == 0
+
+def test_never_merges_on_empty_title_or_committee(db_path):
+    index = DedupIndex(db.get_conn(), ["1", "2", "3", "4"])
+    assert index.canonical("1", HEARING_API.format(1), hearing(title=""), {}) is None
+    assert index.canonical("2", MEETING_API.format(2), hearing(title=""), {}) is None
+    assert index.canonical("3", HEARING_API.format(3), hearing(committee=None), {}) is None
+    assert index.canonical("4", MEETING_API.format(4), hearing(committee=None), {}) is None
+    assert index.merged == 0
+
+def test_merges_on_cross_reference(db_path):
+    conn = db.get_conn()
+    store(conn, "55", MEETING_API.format(55), hearing("Oversight"))
+    index = DedupIndex(conn, ["7"])
+    detail = {"associatedMeeting": {"eventId": "55"}}
+    assert index.canonical("7", HEARING_API.format(7), hearing("Different title"), detail) == "55"
@@ -0,0 +1,116 @@
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from conftest import day
+
+import db
+import deliver
+import post
+
+
+def entries(n):
+    return tuple(("House Judiciary", f"Hearing {i}", f"https://docs/{i}.pdf") for i in range(n))
+
+def is_header(block):
+    return not deliver._is_list(block)
+
+
+def test_short_digest_is_one_message():
+    blocks = post.render_date(day(1), entries(3))
+    assert deliver.chunk_messages(blocks) == [blocks]
+
+def test_long_list_is_split():
+    blocks = post.render_date(day(1), entries(deliver.MAX_LIST_ITEMS * 3 + 1))
+    messages = deliver.chunk_messages(blocks)
+
+    lists = [block for message in messages for block in message if deliver._is_list(block)]
+    items = [item for block in lists for e in block["elements"] for item in e["elements"]]
+    assert len(items) == deliver.MAX_LIST_ITEMS * 3 + 1
+    assert all(len(e["elements"]) <= deliver.MAX_LIST_ITEMS for block in lists for e in block["elements"])
+
+def test_messages_respect_block_limit_and_keep_headers_with_lists():
+    blocks = []
+    for offset in range(1, 40):
+        blocks += post.render_date(day(offset), entries(2))
+    messages = deliver.chunk_messages(blocks)
+
+    assert len(messages) > 1
+    assert [block for message in messages for block in message] == blocks
+    for message in messages:
+        assert len(message) <= deliver.MAX_BLOCKS
+        assert not is_header(message[-1])  # a date header never ends a message
+
+
+# ─── publish_digest ────────────────────────────────────────────────────────────
+
+class FakeSlack:
+    def __init__(self):
+        self.messages = {}   # ts -> blocks
+        self.calls    = []
+        self.next_ts  = 0
+
+    def chat_postMessage(self, channel, text, blocks):
+        self.next_ts += 1
+        ts = f"{self.next_ts}.0"
+        self.messages[ts] = blocks
+        self.calls.append(("post", ts))
+        return {"channel": "C1", "ts": ts}
+
+    def chat_update(self, channel, ts, text, blocks):
+        self.calls.append(("update", ts))
+        if ts not in self.messages:
+            raise SlackApiError("message_not_found", FakeResponse("message_not_found"))
+        self.messages[ts] = blocks
+        return {"channel": "C1", "ts": ts}
+
+    def chat_delete(self, channel, ts):
+        self.calls.append(("delete", ts))
+        self.messages.pop(ts, None)
+
+class FakeResponse(dict):
+    status_code = 400
+    headers     = {}
+
+    def __init__(self, error):
+        super().__init__(ok=False, error=error)
+
+class NoWait:
+    def take(self):
+        pass
+
+@pytest.fixture
+def slack(db_path, monkeypatch):
+    monkeypatch.setattr(deliver, "TokenBucket", NoWait)
+    return FakeSlack()
+
+def publish(slack, rows, kind="upcoming"):
+    return deliver.publish_digest(slack, kind, "#hearings", "Upcoming hearings on", rows)
+
+def row(offset, title):
+    return (day(offset), "House Judiciary", title, "")
+
+
+def test_digest_posts_then_skips_then_edits(slack):
+    assert publish(slack, [row(1, "A"), row(2, "B")]) == (2, 0, 0)
+    assert publish(slack, [row(1, "A"), row(2, "B")]) == (0, 0, 2)
+    assert publish(slack, [row(1, "A"), row(2, "B"), row(2, "C")]) == (0, 1, 1)
+    assert [call for call, _ in slack.calls] == ["post", "post", "update"]
+
+def test_digest_deletes_dates_without_hearings(slack):
+    publish(slack, [row(1, "A"), row(2, "B")])
+    publish(slack, [row(1, "A")])
+    assert ("delete", "2.0") in slack.calls
+    assert set(slack.messages) == {"1.0"}
+    assert set(db.get_digests(db.get_conn(), "upcoming", "#hearings")) == {day(1)}
+
+def test_digest_reposts_when_message_cannot_be_edited(slack):
+    publish(slack, [row(1, "A")])
+    slack.messages.clear()  # deleted by someone in Slack
+    assert publish(slack, [row(1, "A"), row(1, "B")]) == (0, 1, 0)
+    assert set(slack.messages) == {"2.0"}
+    assert db.get_digests(db.get_conn(), "upcoming", "#hearings")[day(1)]["ts"] == ["2.0"]
+
+def test_digest_kinds_do_not_share_messages(slack):
+    publish(slack, [row(1, "A")], kind="last_update:2025-06-01")
+    assert publish(slack, [row(1, "B")], kind="last_update:2025-06-02") == (1, 0, 0)
+    assert len(slack.messages) == 2
@@ -0,0 +1,66 @@
+import threading
+from datetime import date, timedelta
+
+from flask import Flask
+
+from conftest import day
+
+import db
+import feeds
+
+
+class View:
+    listeners = []
+
+def app_with_feeds(rows):
+    conn = db.get_conn()
+    db.insert_hearings(conn, [(str(i), d, title, committee, "", day(0), f"https://api/{i}", "Scheduled",
+                               None, None) for i, (d, committee, title) in enumerate(rows)])
+    conn.commit()
+    app = Flask(__name__)
+    feeds.register(app, View())
+    return app.test_client()
+
+
+def test_conditional_and_gzip_responses(db_path):
+    client = app_with_feeds([(day(1), "House Judiciary", "Oversight"), (day(-1), "House Judiciary", "Past")])
+
+    first = client.get("/hearings.json")
+    assert [h["title"] for h in first.json["hearings"]] == ["Oversight"]
+    assert client.get("/hearings.json", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    gzipped = client.get("/hearings.json", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] != first.headers["ETag"]
+
+def test_filters_and_ics(db_path):
+    client = app_with_feeds([(day(1), "House Judiciary", "Oversight"),
+                             (day(5), "Senate Energy", "Water rights; tribal, lands")])
+
+    ics = client.get(f"/hearings.ics?committee=energy&from={day(2)}").data.decode()
+    assert ics.count("BEGIN:VEVENT") == 1
+    assert r"SUMMARY:Senate Energy: Water rights\; tribal\, lands" in ics
+    assert all(len(line.encode()) <= 75 for line in ics.split("\r\n"))
+    assert client.get("/hearings.json?to=not-a-date").status_code == 400
+
+def test_concurrent_rebuilds_share_the_connection_safely(db_path):
+    client = app_with_feeds([(day(i % 30), "House Judiciary", f"Hearing {i}") for i in range(300)])
+    feed = feeds.Feeds()
+    errors = []
+
+    def work():
+        try:
+            for _ in range(20):
+                feed.built_on = date.today() - timedelta(days=1)  # day rolled over
+                feed.get("json")
+                feed.rebuild()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(feed.rows) == 300
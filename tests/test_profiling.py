@@ -0,0 +1,29 @@
+import pstats
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_profiled_sees_pool_threads(tmp_path):
+    with profiling.profiled("update", tmp_path) as run_id:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(busy, 20000) for _ in range(8)]
+            results = [future.result(timeout=30) for future in futures]  # a dead worker hangs here
+
+    assert results == [busy(20000)] * 8
+    for suffix in ("pstats", "tracemalloc", "txt"):
+        assert (tmp_path / f"{run_id}.{suffix}").exists()
+    stats = pstats.Stats(str(tmp_path / f"{run_id}.pstats"))
+    assert any(func[2] == "busy" for func in stats.stats)
+
+def test_no_thread_hook_from_312(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PER_THREAD", False)
+    with profiling.profiled("update", tmp_path):
+        assert threading.getprofile() is None
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            assert list(pool.map(busy, [10, 10])) == [busy(10)] * 2
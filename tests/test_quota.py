@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+import quota
+
+
+@pytest.fixture
+def bucket(tmp_path, monkeypatch):
+    monkeypatch.setattr(quota, "QUOTA_PATH", str(tmp_path / "quota.db"))
+    monkeypatch.setattr(quota, "_conn", None)
+    monkeypatch.setattr(quota, "_lock_file", None)
+    monkeypatch.setattr(quota, "_local", 0)
+    monkeypatch.setattr(quota, "API_QUOTA", 100)
+    monkeypatch.setattr(quota, "RATE", 1e-9)  # no refill during the test
+    monkeypatch.setattr(quota, "BATCH", 10)
+    yield
+    if quota._conn is not None:
+        quota._conn.close()
+        quota._lock_file.close()
+
+
+def test_tokens_are_taken_in_batches(bucket):
+    quota.acquire("ingest")
+    assert quota.remaining() == pytest.approx(90)
+    for _ in range(9):
+        quota.acquire("ingest")
+    assert quota.remaining() == pytest.approx(90)
+    quota.acquire("ingest")
+    assert quota.remaining() == pytest.approx(80)
+
+def test_batch_stops_at_the_priority_reserve(bucket):
+    with quota._locked() as conn:
+        quota._save(conn, 28.0, time.time())
+
+    quota.acquire("bulk")  # bulk must leave 25 of 100
+    assert quota.remaining() == pytest.approx(25)
+    assert quota._local == 2
@@ -0,0 +1,50 @@
+from conftest import day
+
+import db
+import fetch
+import reextract
+from extract import normalize
+
+
+def meeting(ev_id, title, url=None):
+    return {
+        "eventId":          ev_id,
+        "date":             f"{day(3)}T14:00:00Z",
+        "title":            title,
+        "committees":       [{"name": "House Judiciary"}],
+        "meetingStatus":    "Scheduled",
+        "meetingDocuments": [{"url": url}] if url else [],
+    }
+
+def archive(conn, ev_id, detail, fetched_at):
+    body, digest = db.pack(detail)
+    conn.execute("INSERT INTO payloads (event_id, fetched_at, digest, body) VALUES (?, ?, ?, ?)",
+                 (ev_id, fetched_at, digest, body))
+
+def store(conn, ev_id, detail, **columns):
+    h = normalize(detail)
+    row = dict(zip(("date", "title", "committee", "url", "status"), h.fields()), **columns)
+    db.insert_hearings(conn, [(ev_id, row["date"], row["title"], row["committee"], row["url"], day(0),
+                               f"https://api/{ev_id}", row["status"], h.digest(), h.fingerprint())])
+
+
+# Columns are rebuilt from each event's latest payload, without API calls, and only
+# rows whose columns differ are rewritten
+def test_rebuilds_columns_from_latest_payload(db_path, monkeypatch):
+    monkeypatch.setattr(fetch, "_get", lambda *args, **kwargs: 1 / 0)
+    conn = db.get_conn()
+    with conn:
+        # Stored by an older extractor that dropped the document URL
+        store(conn, "1", meeting("1", "Oversight hearing", "https://docs/1.pdf"), url="")
+        archive(conn, "1", meeting("1", "Oversight hrg"), "2025-01-01T00:00:00+00:00")
+        archive(conn, "1", meeting("1", "Oversight hearing", "https://docs/1.pdf"), "2025-02-01T00:00:00+00:00")
+        # Already up to date
+        store(conn, "2", meeting("2", "Budget hearing"))
+        archive(conn, "2", meeting("2", "Budget hearing"), "2025-02-01T00:00:00+00:00")
+    written = conn.rows_written
+
+    assert reextract.reextract(batch_size=1) == 1
+
+    assert conn.execute("SELECT title, URL FROM hearings WHERE id = '1'").fetchone() == (
+        "Oversight hearing", "https://docs/1.pdf")
+    assert conn.rows_written - written == 1
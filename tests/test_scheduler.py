@@ -0,0 +1,51 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import db
+import scheduler
+
+
+def test_jobs_at_the_same_time_share_a_slot_in_order():
+    slots = scheduler.slots([
+        ("check_status", "13:00", (1, 2, 3, 4, 5)),
+        ("update",       "13:00", (1, 2, 3, 4, 5)),
+        ("upcoming",     "14:00", (1,)),
+        ("backfill",     "13:00", (1, 2, 3, 4, 5)),
+    ])
+    assert [slot.names for slot in slots] == [["check_status", "update", "backfill"], ["upcoming"]]
+
+def test_slot_runs_next_weekday_within_jitter(monkeypatch):
+    monkeypatch.setattr(scheduler, "JITTER", 300)
+    slot = scheduler.slots([("update", "13:00", (1, 2, 3, 4, 5))])[0]
+    friday_evening = datetime(2025, 6, 20, 18, 0, tzinfo=timezone.utc)
+
+    next_run = slot.schedule(friday_evening, friday_evening.replace(hour=13, minute=2))
+
+    monday = datetime(2025, 6, 23, 13, 0, tzinfo=timezone.utc)
+    assert monday <= next_run <= monday.replace(minute=5)
+
+# A restart after 13:00 but before the jittered run time must not skip the day
+def test_restart_runs_todays_missed_slot():
+    slot = scheduler.slots([("update", "13:00", (1, 2, 3, 4, 5))])[0]
+    restart = datetime(2025, 6, 18, 13, 2, tzinfo=timezone.utc)
+
+    assert slot.schedule(restart, restart - timedelta(days=1)) == restart
+    assert slot.schedule(restart) == restart  # never ran
+    assert slot.schedule(restart, restart.replace(minute=1)) > restart + timedelta(hours=23)
+
+def test_completed_slots_are_recorded(db_path, monkeypatch):
+    ran, stop = [], threading.Event()
+    monkeypatch.setattr(scheduler, "TICK", 0)
+
+    def run(name):
+        ran.append(name)
+        if name == "backfill":
+            stop.set()
+
+    scheduler.run_forever(run, stop, [
+        ("update",   "00:00", tuple(range(1, 8))),
+        ("backfill", "00:00", tuple(range(1, 8))),
+    ])
+
+    assert ran == ["update", "backfill"]  # due today and never ran: run on startup
+    assert list(db.last_runs(db.get_conn())) == ["update, backfill"]
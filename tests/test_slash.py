@@ -0,0 +1,41 @@
+from conftest import day
+
+import db
+import slash
+
+
+def store(conn, ev_id, date_str, title):
+    db.insert_hearings(conn, [(ev_id, date_str, title, "House Judiciary", "", day(0), f"https://api/{ev_id}",
+                               "Scheduled", None, None)])
+
+
+# The view loads upcoming hearings once, then applies only rows whose rev moved
+def test_view_applies_rows_written_since_last_refresh(db_path):
+    conn = db.get_conn()
+    with conn:
+        store(conn, "1", day(1), "Oversight")
+        store(conn, "2", day(2), "Budget")
+        store(conn, "3", day(-1), "Past")
+    view = slash.UpcomingView()
+    snapshots = []
+    view.listeners.append(lambda v: snapshots.append(v.snapshot))
+
+    assert view.refresh()
+    assert [row[2] for row in view.snapshot] == ["Oversight", "Budget"]
+    assert not view.refresh()  # no commit since: data_version has not moved
+
+    generation = view.generation
+    with conn:
+        conn.execute("UPDATE hearings SET title = 'Oversight of the FBI' WHERE id = '1'")
+        conn.execute("UPDATE hearings SET date = ? WHERE id = '2'", (day(-2),))  # moved into the past
+        store(conn, "4", day(3), "Nominations")
+
+    assert view.refresh()
+    assert [row[2] for row in view.snapshot] == ["Oversight of the FBI", "Nominations"]
+    assert view.generation == generation + 1
+    assert view.rev == conn.execute("SELECT MAX(rev) FROM hearings").fetchone()[0]
+    assert len(snapshots) == 2
+
+    with conn:
+        conn.execute("UPDATE hearings SET title = 'Still past' WHERE id = '3'")
+    assert not view.refresh()  # a past hearing changed: nothing to show
@@ -0,0 +1,100 @@
+import pytest
+
+from conftest import day
+
+import alerts
+import db
+import fetch
+import update
+from alerts import KeywordMatcher
+
+
+PAGES = {0: ["1", "2"], 2: ["3", "4"], 4: ["5", "6"]}  # listing offset -> event ids
+
+
+def meeting(ev_id):
+    return {
+        "eventId":       ev_id,
+        "date":          f"{day(3)}T14:00:00Z",
+        "title":         f"Hearing {ev_id}",
+        "committees":    [{"name": "House Judiciary"}],
+        "meetingStatus": "Scheduled",
+    }
+
+# A fake Congress.gov listing of PAGES for meetings (hearings list nothing). Records
+# each request as (kind, offset, since, until); fetch_page(offset) raises for the
+# offsets in fail_at, and detail requests fail for the ids in failed_details.
+@pytest.fixture
+def api(db_path, monkeypatch):
+    state = {"requests": [], "fail_at": set(), "failed_details": set()}
+
+    def fetch_page(kind, offset, congress=None, status=None, since=None, until=None):
+        state["requests"].append((kind, offset, since, until))
+        if offset in state["fail_at"]:
+            raise ConnectionError("listing unavailable")
+        ids = PAGES.get(offset, []) if kind == "meeting" else []
+        events = [{"eventId": ev_id, "url": f"https://api/{ev_id}"} for ev_id in ids]
+        return events, offset + len(ids) in PAGES, None
+
+    def fetch_details(urls):
+        ids = [url.rsplit("/", 1)[1] for url in urls]
+        return [None if ev_id in state["failed_details"] else meeting(ev_id) for ev_id in ids]
+
+    monkeypatch.setattr(fetch, "fetch_page", fetch_page)
+    monkeypatch.setattr(update, "fetch_details", fetch_details)
+    monkeypatch.setattr(alerts, "get_matcher", lambda: KeywordMatcher({}))
+    return state
+
+def meeting_requests(state):
+    return [request[1:] for request in state["requests"] if request[0] == "meeting"]
+
+def sync_state(conn):
+    return conn.execute("SELECT cursor, window_end, page_offset FROM sync_state WHERE kind = 'meeting'"
+                        ).fetchone()
+
+def stored_ids(conn):
+    return [row[0] for row in conn.execute("SELECT id FROM hearings ORDER BY id")]
+
+
+def test_interrupted_sweep_resumes_from_saved_offset(api):
+    conn = db.get_conn()
+    api["fail_at"] = {4}
+    update.update()
+
+    cursor, window_end, offset = sync_state(conn)
+    assert (cursor, offset) == (None, 4)  # pages 0 and 2 are stored, the cursor has not moved
+    assert window_end
+    assert stored_ids(conn) == ["1", "2", "3", "4"]
+
+    api["fail_at"] = set()
+    api["requests"].clear()
+    update.update()
+
+    assert meeting_requests(api) == [(4, None, window_end)]  # same window, from the saved offset
+    assert sync_state(conn) == (window_end, None, 0)
+    assert stored_ids(conn) == ["1", "2", "3", "4", "5", "6"]
+
+def test_cursor_moves_only_after_a_completed_sweep(api):
+    conn = db.get_conn()
+    update.update()
+    cursor, window_end, offset = sync_state(conn)
+    assert cursor and window_end is None and offset == 0
+
+    api["requests"].clear()
+    update.update()
+
+    since = {request[1] for request in meeting_requests(api)}
+    assert since == {cursor}  # the next sweep only lists events updated since the last one
+
+def test_failed_details_are_retried_on_the_next_run(api):
+    conn = db.get_conn()
+    api["failed_details"] = {"3"}
+    update.update()
+    assert stored_ids(conn) == ["1", "2", "4", "5", "6"]
+    assert db.failed_events(conn, "meeting", update.RETRY_ATTEMPTS) == [("3", "https://api/3")]
+
+    api["failed_details"] = set()
+    update.update()
+
+    assert stored_ids(conn) == ["1", "2", "3", "4", "5", "6"]
+    assert db.failed_events(conn, "meeting", update.RETRY_ATTEMPTS) == []
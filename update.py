@@ -1,23 +1,20 @@
-import sqlite3
-from fetch import fetch_all, fetch_event_detail 
-from extract import get_date, get_title, get_committee, get_URL, parse_date, get_status
-from datetime import datetime, date
+from fetch import fetch_pages, fetch_details
+from db import (get_conn, begin_sync, save_sync_offset, finish_sync, archive_payloads,
+                insert_hearings, failed_events, record_failures)
+from dedup import DedupIndex
+from extract import get_committee, normalize
+from datetime import date
+from itertools import chain
 from post import post_slack 
-from excluded import irrelevant_hearings 
-from pathlib import Path
-from dotenv import load_dotenv
-from flask import Flask 
-from slackeventsapi import SlackEventAdapter
-from slack_sdk import WebClient
-import os
+from committee_filter import is_excluded
+from alerts import route, has_subscriptions
 import sys # delete later
-from hearing_bot import check_status
-
-DB_PATH = os.getenv("DATABASE_PATH", "/data/hearings.db")
+import time
+import metrics
 
 # Deletes the last inputted rows from the database (testing purposes)
 def delete_rows():
-    conn = sqlite3.connect('hearings.db')
+    conn = get_conn()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -35,104 +32,181 @@ def delete_rows():
         )
         conn.commit()
 
-    conn.close()
-
-# Update the database with new hearings and meetings
-def update(path): 
+KNOWN_ERRORS = ["118388", "118320", "118290", "118290", "58326", "118259"] 
 
-    conn = sqlite3.connect(path, check_same_thread=False) 
-    c    = conn.cursor()
+RETRY_ATTEMPTS = 5  # runs that retry an event whose detail request failed before giving up
 
-    # Preload seen IDs or start fresh if table missing
-    try:
-        c.execute("SELECT id FROM hearings")
-        seen_ids = {row[0] for row in c.fetchall()}
-    except Exception as e:
-        seen_ids = set() 
+# Committee meetings are keyed by eventId, hearings by jacketNumber
+def event_id(event):
+    return event.get("eventId") or str(event.get("jacketNumber"))
 
-    print(f"Seen IDs loaded: {len(seen_ids)}")
+def event_ids(events):
+    return [event_id(event) for event in events]
 
-    known_errors = ["118388", "118320", "118290", "118290", "58326", "118259"] 
+# Fetch details for one page of listed events. seen_ids is the page's dedup.DedupIndex:
+# stored and aliased events are skipped before the detail request, and duplicates of a
+# stored hearing found after it are merged instead of stored.
+# Returns (new_hearings, new_upcoming_hearings, alerts, payloads, failed), failed being
+# the (id, api_call) of events whose detail request failed.
+def process_events(events, seen_ids):
     new_hearings = [] 
     new_upcoming_hearings = []
+    alerts = []  # (channel, row) for upcoming hearings matching a keyword subscription
+    failed = []
 
-    # Fetch the 250 most recently updated hearings and meetings from the API
-    try:
-        events = fetch_all("hearing") + fetch_all("meeting")  
-    except Exception as e:
-        print(f"Error fetching events: {e}")
-        return
-
-    # Process each event, checking if it's already in the database
+    # Keep only events not already in the database
+    candidates = []
     for event in events:
-        ev_id = event.get("eventId") or str(event.get("jacketNumber"))
-        if ev_id in seen_ids or ev_id in known_errors: 
+        ev_id = event_id(event)
+        if ev_id in seen_ids or ev_id in KNOWN_ERRORS: 
             continue
         seen_ids.add(ev_id)
 
-        # If new event, fetch its details
+        # Skip excluded committees before the detail request when the listing names the
+        # committee, unless keyword subscriptions (which cover every committee) exist.
+        # Congress.gov listing items carry no committee, so against the real API this
+        # never fires: excluded events are fetched and only dropped after the detail.
+        committee = get_committee(event)
+        if is_excluded(committee) and not has_subscriptions():
+            print(f"Skipping irrelevant event {ev_id} in {committee}")
+            continue
+        candidates.append((ev_id, event.get("url")))
+
+    if not candidates:
+        return new_hearings, new_upcoming_hearings, alerts, [], failed
+
+    # Fetch details for the new events concurrently (order is preserved)
+    print(f"Fetching details for {len(candidates)} new events")
+    details = fetch_details([api_call for _, api_call in candidates])
+
+    extract_start = time.perf_counter()
+    today = date.today().isoformat()
+    duplicates = set()
+    for (ev_id, api_call), detail in zip(candidates, details):
+        if api_call and detail is None:
+            print(f"Detail request failed for event {ev_id}, retrying next run")
+            failed.append((ev_id, api_call))
+            continue
         try:
-            api_call = event["url"]
-            detail    = fetch_event_detail(api_call)
-            committee = get_committee(detail) 
-            title     = get_title(detail)
-            date_obj  = get_date(detail)
-            url       = get_URL(detail)
-            status    = get_status(detail)
+            if not api_call:
+                raise ValueError("event has no API url")
+            h = normalize(detail)
 
         except Exception as e:
+            if ev_id in KNOWN_ERRORS: 
+                continue
             print(f"Error processing event {ev_id}: {e}")
             continue 
 
+        if seen_ids.canonical(ev_id, api_call, h, detail):
+            duplicates.add(ev_id)
+            continue
+
+        new_hearings.append((ev_id, h.date, h.title, h.committee, h.url, today, api_call, h.status,
+                             h.digest(), h.fingerprint()))
+
+        # Check if the new hearing is an upcoming hearing, skipping irrelevant ones.
+        # Keyword subscriptions cover every committee, excluded ones included.
+        if h.date >= today:
+            for channel, keywords in route(h.title, h.committee).items():
+                print(f"Alert for {channel} ({', '.join(keywords)}): {h.title}")
+                alerts.append((channel, (h.date, h.committee, h.title, h.url)))
+            if is_excluded(h.committee):
+                print(f"Skipping irrelevant hearing titled {h.title} in {h.committee}")
+                continue 
+            new_upcoming_hearings.append((h.date, h.committee, h.title, h.url)) 
+            print(f"New hearing found: {h.status}: {h.date} | {h.committee} | {h.title}")
+    metrics.add_time("extract", time.perf_counter() - extract_start)
+
+    payloads = [(ev_id, detail) for (ev_id, _), detail in zip(candidates, details)
+                if ev_id not in duplicates]
+    return new_hearings, new_upcoming_hearings, alerts, payloads, failed
+
+# Events of kind that failed on earlier runs, shaped like listing entries
+def retry_events(conn, kind):
+    return [{"eventId": ev_id, "url": api_call}
+            for ev_id, api_call in failed_events(conn, kind, RETRY_ATTEMPTS)]
+
+# Process one page of events and store it with its payloads and failures in one
+# transaction; checkpoint(), if given, records the page in that same transaction.
+# Returns (inserted, upcoming, alerts)
+def store_events(conn, kind, events, checkpoint=None):
+    index = DedupIndex(conn, event_ids(events))
+    new_hearings, upcoming, matched, payloads, failed = process_events(events, index)
+
+    failed_ids = {ev_id for ev_id, _ in failed}
+    with metrics.stage("db_write"), conn:
+        archive_payloads(conn, payloads)
+        insert_hearings(conn, new_hearings)
+        index.save()
+        record_failures(conn, kind, [i for i in event_ids(events) if i not in failed_ids], failed)
+        if checkpoint:
+            checkpoint()
+
+    metrics.count("rows_inserted", len(new_hearings))
+    metrics.count("duplicates_merged", index.merged)
+    metrics.count("detail_failures", len(failed))
+    return len(new_hearings), upcoming, matched
+
+
+# Update the database with new hearings and meetings.
+# Returns (daily_messages, alerts): post_slack() blocks per date for the new upcoming
+# hearings, and {channel: per-date blocks} for those matching keyword subscriptions.
+# With incremental=True only events updated since the last completed run are listed,
+# and each stored page is checkpointed so an interrupted run resumes where it stopped.
+# Events whose detail request failed are retried first on the following runs.
+# Pages are processed as they stream in and checked against the table one page at a
+# time, so memory depends on the page size rather than on how many hearings are stored.
+def update(incremental=True): 
+
+    conn = get_conn()
+
+    inserted = 0
+    new_upcoming_hearings = []
+    alerts = {}
 
-        today = date.today().isoformat()
+    for kind in ("hearing", "meeting"):
+        pages = []
+        retries = retry_events(conn, kind)
+        if retries:
+            print(f"Retrying {len(retries)} {kind}s whose details failed on an earlier run")
+            pages.append((None, retries))
+        since, until, offset = begin_sync(conn, kind) if incremental else (None, None, 0)
 
-        # Check if the new hearing is an upcoming hearing
         try:
-            dt = parse_date(date_obj)
-            date_str = dt.date().isoformat()
-            new_hearings.append((ev_id, date_str, title, committee, url, today, api_call, status))
-            
-            # Skip irrelevant hearings
-            if date_str >= today:
-                if committee in irrelevant_hearings:
-                    print(f"Skipping irrelevant hearing titled {title} in {committee}")
-                    continue 
-                new_upcoming_hearings.append((date_str, committee, title, url)) 
-                print(f"New hearing found: {status}: {date_str} | {committee} | {title}")
-        
+            for offset, events in chain(pages, fetch_pages(kind, since, until, offset)):
+                checkpoint = None
+                if incremental and offset is not None:
+                    checkpoint = lambda: save_sync_offset(conn, kind, offset)
+                count, upcoming, matched = store_events(conn, kind, events, checkpoint)
+                inserted += count
+                new_upcoming_hearings.extend(upcoming)
+                for channel, row in matched:
+                    alerts.setdefault(channel, []).append(row)
+
         except Exception as e:
-            if ev_id in known_errors: 
-                continue
-            print(f"Error parsing {ev_id}: {e}")
+            print(f"Error fetching {kind}s at offset {offset}: {e}")
             continue
+
+        if incremental:
+            finish_sync(conn, kind)
  
-    if not new_hearings:
+    if not inserted:
         print("No new hearings found.")
-        conn.close()
-        return
+        return {}, {}
     
-    with conn:
-        c.executemany(
-            "INSERT INTO hearings (id, date, title, committee, url, date_inserted, API_call, status) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            new_hearings
-        )
-    conn.close()
     print(f"New upcoming hearings: {len(new_upcoming_hearings)}")
-    if new_upcoming_hearings:
-        return post_slack(new_upcoming_hearings) 
+    metrics.count("keyword_alerts", sum(len(rows) for rows in alerts.values()))
+    daily_messages = post_slack(new_upcoming_hearings) if new_upcoming_hearings else {}
+    return daily_messages, {channel: post_slack(rows) for channel, rows in alerts.items()}
 
 
 if __name__ == "__main__": 
-     
-    env_path = Path('.') / '.env'
-    load_dotenv(dotenv_path=env_path)
-    app = Flask(__name__)
-    slack_event_adapter = SlackEventAdapter(os.environ['SIGNING_SECRET'],'/slack/events',app) 
-    client = WebClient(token=os.environ['SLACK_TOKEN']) 
-
-    daily_messages = update("hearings.db") 
+    from backfill import check_status
+    from deliver import deliver
+    from hearing_bot import get_client
+
+    daily_messages, alerts = update() 
     check_status()
 
     if not daily_messages:
@@ -140,9 +214,7 @@ if __name__ == "__main__":
         sys.exit()
     
     print(daily_messages)
-    for date_str, blocks in daily_messages.items():
-        client.chat_postMessage(
-            channel = "#private-test-channel",
-            text = f"New upcoming hearings on {date_str}",
-            blocks=blocks
-        )
\ No newline at end of file
+    deliver(get_client(), [
+        ("#private-test-channel", f"New upcoming hearings on {date_str}", blocks)
+        for date_str, blocks in daily_messages.items()
+    ])